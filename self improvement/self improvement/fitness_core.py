@@ -0,0 +1,1215 @@
+"""Data model, storage and queries behind the Fitness Tracker, usable without Tk
+
+Run it as a script for a command-line interface:
+    
+    python fitness_core.py log 2024-05-01 Running 30 --calories 300
+    python fitness_core.py query --from 2024-05-01 --type Running
+    python fitness_core.py summary
+    python fitness_core.py export workouts.csv
+    python fitness_core.py import history.jsonl
+"""
+from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
+import argparse
+import csv
+import heapq
+import io
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+
+from persistence import append_lines, read_json_lines, write_pending
+
+# NumPy is only needed for WorkoutStats and is imported on first use to keep startup fast
+np = None
+
+def require_numpy():
+    """Import NumPy for WorkoutStats; raises ImportError when it is not installed"""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+SNAPSHOT_FILES = {
+    "workouts": "workouts.json",
+    "challenges": "challenges.json",
+    "settings": "settings.json"
+}
+JOURNAL_FILE = "fitness_journal.jsonl"
+DATABASE_FILE = "fitness.db"
+
+def parse_day(date_str):
+    """Day number (proleptic ordinal) of a YYYY-MM-DD date, or None if it does not parse"""
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+class WorkoutRecord:
+    """A logged workout with its date parsed once into a day number"""
+    
+    __slots__ = ("day", "date", "type", "duration", "calories", "notes")
+    
+    def __init__(self, date_str, workout_type, duration, calories=0.0, notes=""):
+        # day is None only for hand-edited legacy entries whose date never parsed
+        self.day = parse_day(date_str)
+        self.date = date_str
+        self.type = workout_type
+        self.duration = duration
+        self.calories = calories
+        self.notes = notes
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from the workouts.json representation"""
+        return cls(
+            data["date"],
+            data["type"],
+            float(data["duration"]),
+            float(data.get("calories") or 0),
+            data.get("notes", "")
+        )
+    
+    def to_row(self):
+        """Field values in the column order of CSV imports and exports"""
+        return (self.date, self.type, self.duration, self.calories, self.notes)
+    
+    def to_dict(self):
+        """The workouts.json representation of this record"""
+        return {
+            "date": self.date,
+            "type": self.type,
+            "duration": self.duration,
+            "calories": self.calories,
+            "notes": self.notes
+        }
+    
+    def sort_key(self):
+        """Chronological sort key; unparseable dates sort as the oldest"""
+        return self.day or 0
+
+def validate_workout(date_str, workout_type, duration, calories="", notes=""):
+    """Check a workout's fields by the log form's rules; raise ValueError naming the problem"""
+    if not all([date_str, workout_type, duration]):
+        raise ValueError("Please fill in all required fields (Date, Type, Duration)")
+    
+    try:
+        duration = float(duration)
+        calories = float(calories) if calories else 0
+    except ValueError:
+        raise ValueError("Duration and Calories must be numbers")
+    # float() also accepts "nan" and "inf", which SQLite cannot store as a duration
+    if not (math.isfinite(duration) and math.isfinite(calories)) or duration < 0 or calories < 0:
+        raise ValueError("Duration and Calories must be zero or more")
+    
+    day = parse_day(date_str)
+    if day is None:
+        raise ValueError("Date must be in YYYY-MM-DD format")
+    
+    # Store the date in canonical form
+    return WorkoutRecord(date.fromordinal(day).isoformat(), workout_type, duration, calories, notes)
+
+class FitnessJournal:
+    """Append-only change log kept on top of the JSON snapshot files"""
+    
+    # Fold the journal into the snapshots once it holds this many records, or as
+    # many as the snapshot itself so bulk imports do not compact over and over
+    COMPACT_EVERY = 500
+    
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.marker = path + ".compact"
+        self.record_count = 0
+    
+    def recover(self):
+        """Finish or roll back a compaction that was interrupted by a crash"""
+        tmp_files = [name + ".tmp" for name in SNAPSHOT_FILES.values()]
+        if os.path.exists(self.marker):
+            # The new snapshots were fully written before the crash, so roll them forward
+            for tmp in tmp_files:
+                if os.path.exists(tmp):
+                    os.replace(tmp, tmp[:-len(".tmp")])
+            self.truncate()
+            os.remove(self.marker)
+        else:
+            # The journal is still authoritative; drop any half-written snapshots
+            for tmp in tmp_files:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+    
+    def replay(self):
+        """Return (op, data) for every complete record in the journal"""
+        records = [(record["op"], record["data"]) for record in read_json_lines(self.path)]
+        self.record_count = len(records)
+        return records
+    
+    def append(self, records):
+        """Durably append a batch of (op, data) records to the journal"""
+        append_lines(self.path, [json.dumps({"op": op, "data": data}) + "\n" for op, data in records])
+        self.record_count += len(records)
+    
+    def compact(self, state):
+        """Write fresh snapshots of state and empty the journal"""
+        for key, name in SNAPSHOT_FILES.items():
+            self.write_durably(name + ".tmp", json.dumps(state[key]))
+        
+        # The marker is the commit point: from here on recover() rolls forward
+        self.write_durably(self.marker, "")
+        for name in SNAPSHOT_FILES.values():
+            os.replace(name + ".tmp", name)
+        self.truncate()
+        os.remove(self.marker)
+    
+    def truncate(self):
+        """Empty the journal file"""
+        self.write_durably(self.path, "")
+        self.record_count = 0
+    
+    @staticmethod
+    def write_durably(path, text):
+        """Write text to path and make sure it has reached the disk"""
+        with open(path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+class JsonStore:
+    """Storage backend keeping everything in memory, persisted as JSON snapshots plus a journal"""
+    
+    def __init__(self, journal_path=JOURNAL_FILE):
+        self.journal = FitnessJournal(journal_path)
+        self.workouts = []      # WorkoutRecords in chronological order
+        self.days = []          # sort_key() of each entry in self.workouts
+        self.in_order = True    # False after a bulk import appended older workouts
+        self.snapshot_size = 0  # Workouts in workouts.json
+        self.challenges = []
+        self.settings = {}
+        
+        # Changes made in memory but not yet journaled; flush() may run on another thread
+        self.pending = []
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Load the snapshot files and replay the journal on top of them"""
+        self.journal.recover()
+        
+        workouts = []
+        if os.path.exists(SNAPSHOT_FILES["workouts"]):
+            with open(SNAPSHOT_FILES["workouts"], 'r') as f:
+                workouts = [WorkoutRecord.from_dict(w) for w in json.load(f)]
+        self.snapshot_size = len(workouts)
+        
+        if os.path.exists(SNAPSHOT_FILES["challenges"]):
+            with open(SNAPSHOT_FILES["challenges"], 'r') as f:
+                self.challenges = json.load(f)
+        
+        if os.path.exists(SNAPSHOT_FILES["settings"]):
+            with open(SNAPSHOT_FILES["settings"], 'r') as f:
+                self.settings = json.load(f)
+        
+        for op, data in self.journal.replay():
+            if op == "workout":
+                workouts.append(WorkoutRecord.from_dict(data))
+            elif op == "challenge":
+                self.challenges.append(data)
+            elif op == "settings":
+                self.settings = data
+        
+        workouts.sort(key=WorkoutRecord.sort_key)
+        self.workouts = workouts
+        self.days = [w.sort_key() for w in workouts]
+    
+    def flush(self):
+        """Journal the pending changes, compacting once the journal grows long"""
+        write_pending(self, self.journal.append)
+        
+        if self.journal.record_count >= max(FitnessJournal.COMPACT_EVERY, self.snapshot_size):
+            self.compact()
+    
+    def compact(self):
+        """Fold the journal and any pending changes into fresh snapshot files"""
+        with self.lock:
+            workouts = list(self.workouts)
+            challenges = [dict(c) for c in self.challenges]
+            settings = dict(self.settings)
+            self.pending = []
+        
+        self.snapshot_size = len(workouts)
+        self.journal.compact({
+            "workouts": [w.to_dict() for w in workouts],
+            "challenges": challenges,
+            "settings": settings
+        })
+    
+    def record_change(self, op, data):
+        """Queue a change for the next flush; the caller holds the lock"""
+        self.pending.append((op, data))
+    
+    def close(self):
+        """Nothing to release; flush() has already written everything"""
+        pass
+    
+    def load_challenges(self):
+        """Return all saved challenges"""
+        return list(self.challenges)
+    
+    def load_settings(self):
+        """Return the saved settings"""
+        return dict(self.settings)
+    
+    def add_workout(self, workout):
+        """Store a new workout"""
+        self.ensure_order()
+        
+        # bisect_right keeps workouts from the same day in the order they were logged
+        index = bisect_right(self.days, workout.sort_key())
+        with self.lock:
+            self.workouts.insert(index, workout)
+            self.days.insert(index, workout.sort_key())
+            self.record_change("workout", workout.to_dict())
+    
+    def add_workouts(self, workouts):
+        """Store a batch of imported workouts, deferring the sort until they are next read"""
+        with self.lock:
+            for workout in workouts:
+                if self.days and workout.sort_key() < self.days[-1]:
+                    self.in_order = False
+                self.workouts.append(workout)
+                self.days.append(workout.sort_key())
+                self.record_change("workout", workout.to_dict())
+    
+    def ensure_order(self):
+        """Restore chronological order after an out-of-order bulk import"""
+        if self.in_order:
+            return
+        
+        # sort() is stable, so workouts from the same day keep the order they were added in
+        with self.lock:
+            self.workouts.sort(key=WorkoutRecord.sort_key)
+            self.days = [w.sort_key() for w in self.workouts]
+            self.in_order = True
+    
+    def add_challenge(self, challenge):
+        """Store a new challenge"""
+        with self.lock:
+            self.challenges.append(challenge)
+            self.record_change("challenge", dict(challenge))
+    
+    def save_settings(self, settings):
+        """Replace the saved settings"""
+        with self.lock:
+            self.settings = dict(settings)
+            self.record_change("settings", dict(settings))
+    
+    def workouts_between(self, start_date, end_date, workout_type=None):
+        """Workouts dated between start_date and end_date inclusive, optionally of one type"""
+        self.ensure_order()
+        lo = bisect_left(self.days, start_date.toordinal())
+        hi = bisect_right(self.days, end_date.toordinal())
+        if workout_type is None:
+            return self.workouts[lo:hi]
+        return [w for w in self.workouts[lo:hi] if w.type == workout_type]
+    
+    def count_workouts(self, start_date, end_date):
+        """Number of workouts dated between start_date and end_date inclusive"""
+        return len(self.workouts_between(start_date, end_date))
+    
+    def sum_calories(self, start_date, end_date):
+        """Calories burned between start_date and end_date inclusive"""
+        return sum(w.calories for w in self.workouts_between(start_date, end_date))
+    
+    def recent_workouts(self, limit=None):
+        """Workouts newest first, optionally only the first limit of them"""
+        return self.workouts_page(0, len(self.workouts) if limit is None else limit)
+    
+    def workout_count(self):
+        """Total number of stored workouts"""
+        return len(self.workouts)
+    
+    def workouts_page(self, offset, limit):
+        """limit workouts starting offset rows into the newest-first history"""
+        self.ensure_order()
+        end = len(self.workouts) - offset
+        return self.workouts[max(end - limit, 0):max(end, 0)][::-1]
+    
+    def workout_position(self, workout):
+        """Row of a just-added workout in the newest-first history"""
+        self.ensure_order()
+        return len(self.workouts) - bisect_right(self.days, workout.sort_key())
+    
+    def all_workouts(self):
+        """Every stored workout, oldest first"""
+        self.ensure_order()
+        return iter(self.workouts)
+    
+    def daily_totals(self, first_day=None, end_day=None):
+        """(day number, workout count, calories, duration) for every day that has workouts
+        
+        With first_day and end_day only days in [first_day, end_day) are totalled.
+        """
+        self.ensure_order()
+        if first_day is None:
+            workouts = self.workouts
+        else:
+            workouts = self.workouts[bisect_left(self.days, first_day):bisect_left(self.days, end_day)]
+        
+        totals = {}
+        for w in workouts:
+            if w.day is not None:
+                count, calories, duration = totals.get(w.day, (0, 0, 0))
+                totals[w.day] = (count + 1, calories + w.calories, duration + w.duration)
+        return [(day, count, calories, duration) for day, (count, calories, duration) in totals.items()]
+
+class SqliteStore:
+    """Storage backend keeping workouts, challenges and settings in a SQLite database"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS workouts (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            duration REAL NOT NULL,
+            calories REAL NOT NULL,
+            notes TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS workouts_by_date ON workouts (date);
+        CREATE INDEX IF NOT EXISTS workouts_by_type ON workouts (type, date);
+        CREATE TABLE IF NOT EXISTS challenges (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            target REAL NOT NULL,
+            timeframe INTEGER NOT NULL,
+            start_date TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+    
+    CHALLENGE_COLUMNS = ("name", "type", "target", "timeframe", "start_date", "progress")
+    
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.conn = None
+        self.checkpoint_conn = None     # the flushing thread's own connection
+        self.count = 0
+        
+        # One connection shared with the persistence thread, which only ever commits
+        self.lock = threading.RLock()
+    
+    def load(self):
+        """Open the database, creating it and importing the JSON files on first use"""
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # In WAL mode a commit only appends to the log; flush() syncs and checkpoints it
+        # afterwards, so the lock is never held while the disk catches up
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA wal_autocheckpoint=0")
+        self.conn.executescript(self.SCHEMA)
+        self.migrate_from_json()
+        
+        # COUNT(*) walks a whole index, so count once and keep it up to date
+        self.count = self.query("SELECT COUNT(*) FROM workouts")[0][0]
+    
+    def query(self, sql, params=()):
+        """Run a read and return all of its rows"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def execute(self, sql, params=()):
+        """Run a write; it is visible at once and durable after the next flush()"""
+        with self.lock:
+            self.conn.execute(sql, params)
+    
+    def migrate_from_json(self):
+        """One-shot copy of the legacy JSON files into the database"""
+        if self.query("SELECT 1 FROM meta WHERE key = 'migrated_from_json'"):
+            return
+        
+        legacy = JsonStore()
+        legacy.load()
+        
+        # A single transaction, so an interrupted migration is simply retried
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO workouts (date, type, duration, calories, notes) VALUES (?, ?, ?, ?, ?)",
+                (self.workout_row(w) for w in legacy.workouts)
+            )
+            self.conn.executemany(
+                "INSERT INTO challenges (name, type, target, timeframe, start_date, progress) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (tuple(c.get(key, 0) for key in self.CHALLENGE_COLUMNS) for c in legacy.challenges)
+            )
+            self.write_settings(legacy.settings)
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                (datetime.now().isoformat(),)
+            )
+    
+    def flush(self):
+        """Commit the writes made since the last flush and make them durable"""
+        with self.lock:
+            self.conn.commit()
+    
+        # Sync the log and copy it into the database on a separate connection, so the
+        # main thread can keep reading and writing through the shared one meanwhile
+        fd = os.open(self.path + "-wal", os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.checkpoint_conn is None:
+            self.checkpoint_conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.checkpoint_conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    
+    def close(self):
+        """Close the database connections"""
+        if self.checkpoint_conn is not None:
+            self.checkpoint_conn.close()
+            self.checkpoint_conn = None
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+    
+    @staticmethod
+    def workout_row(workout):
+        """Convert a WorkoutRecord into a row for the workouts table"""
+        return (workout.date, workout.type, workout.duration, workout.calories, workout.notes)
+    
+    def load_challenges(self):
+        """Return all saved challenges"""
+        rows = self.query(
+            "SELECT name, type, target, timeframe, start_date, progress FROM challenges ORDER BY id"
+        )
+        return [dict(zip(self.CHALLENGE_COLUMNS, row)) for row in rows]
+    
+    def load_settings(self):
+        """Return the saved settings"""
+        return {key: json.loads(value) for key, value in self.query("SELECT key, value FROM settings")}
+    
+    def add_workout(self, workout):
+        """Store a new workout"""
+        self.execute(
+            "INSERT INTO workouts (date, type, duration, calories, notes) VALUES (?, ?, ?, ?, ?)",
+            self.workout_row(workout)
+        )
+        self.count += 1
+    
+    def add_workouts(self, workouts):
+        """Store a batch of imported workouts; they become durable on the next flush()"""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO workouts (date, type, duration, calories, notes) VALUES (?, ?, ?, ?, ?)",
+                (self.workout_row(workout) for workout in workouts)
+            )
+        self.count += len(workouts)
+    
+    def add_challenge(self, challenge):
+        """Store a new challenge"""
+        self.execute(
+            "INSERT INTO challenges (name, type, target, timeframe, start_date, progress) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            tuple(challenge[key] for key in self.CHALLENGE_COLUMNS)
+        )
+    
+    def save_settings(self, settings):
+        """Replace the saved settings"""
+        with self.lock:
+            self.write_settings(settings)
+    
+    def write_settings(self, settings):
+        """Upsert every setting inside the caller's transaction"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            ((key, json.dumps(value)) for key, value in settings.items())
+        )
+    
+    def count_workouts(self, start_date, end_date):
+        """Number of workouts dated between start_date and end_date inclusive"""
+        return self.query(
+            "SELECT COUNT(*) FROM workouts WHERE date BETWEEN ? AND ?",
+            (start_date.isoformat(), end_date.isoformat())
+        )[0][0]
+    
+    def sum_calories(self, start_date, end_date):
+        """Calories burned between start_date and end_date inclusive"""
+        return self.query(
+            "SELECT COALESCE(SUM(calories), 0) FROM workouts WHERE date BETWEEN ? AND ?",
+            (start_date.isoformat(), end_date.isoformat())
+        )[0][0]
+    
+    def recent_workouts(self, limit=None):
+        """Workouts newest first, optionally only the first limit of them"""
+        return self.workouts_page(0, -1 if limit is None else limit)
+    
+    def workout_count(self):
+        """Total number of stored workouts"""
+        return self.count
+    
+    def workouts_page(self, offset, limit):
+        """limit workouts starting offset rows into the newest-first history"""
+        rows = self.query(
+            "SELECT date, type, duration, calories, notes FROM workouts "
+            "ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        )
+        return [WorkoutRecord(*row) for row in rows]
+    
+    def workout_position(self, workout):
+        """Row of a just-added workout in the newest-first history"""
+        # It has the highest id on its date, so only later dates come before it
+        return self.query("SELECT COUNT(*) FROM workouts WHERE date > ?", (workout.date,))[0][0]
+    
+    def workouts_between(self, start_date, end_date, workout_type=None):
+        """Workouts dated between start_date and end_date inclusive, optionally of one type"""
+        sql = "SELECT date, type, duration, calories, notes FROM workouts WHERE date BETWEEN ? AND ?"
+        params = (start_date.isoformat(), end_date.isoformat())
+        if workout_type is not None:
+            sql += " AND type = ?"
+            params += (workout_type,)
+        return self.iterate_workouts(sql + " ORDER BY date, id", params)
+    
+    def all_workouts(self):
+        """Every stored workout, oldest first"""
+        return self.iterate_workouts(
+            "SELECT date, type, duration, calories, notes FROM workouts ORDER BY date, id"
+        )
+    
+    def iterate_workouts(self, sql, params=(), chunk_size=10000):
+        """WorkoutRecords for the rows of a query, fetched a chunk at a time"""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield WorkoutRecord(*row)
+    
+    def daily_totals(self, first_day=None, end_day=None):
+        """(day number, workout count, calories, duration) for every day that has workouts
+        
+        With first_day and end_day only days in [first_day, end_day) are totalled.
+        """
+        sql = "SELECT date, COUNT(*), SUM(calories), SUM(duration) FROM workouts"
+        params = ()
+        if first_day is not None:
+            sql += " WHERE date >= ? AND date < ?"
+            params = (date.fromordinal(first_day).isoformat(), date.fromordinal(end_day).isoformat())
+        rows = self.query(sql + " GROUP BY date", params)
+        totals = [(parse_day(date_str), count, calories, duration) for date_str, count, calories, duration in rows]
+        return [row for row in totals if row[0] is not None]
+
+STORAGE_BACKENDS = {
+    "json": JsonStore,
+    "sqlite": SqliteStore
+}
+
+class WorkoutImporter:
+    """Streams workouts out of a CSV or JSON Lines export a batch at a time"""
+    
+    BATCH_SIZE = 5000
+    FIELDS = ("date", "type", "duration", "calories", "notes")
+    MAX_ERRORS = 5
+    
+    def __init__(self, path):
+        self.total_bytes = os.path.getsize(path)
+        self.file = open(path, 'rb')
+        self.text = io.TextIOWrapper(self.file, encoding='utf-8-sig', newline='')
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []        # (line number, reason) for the first MAX_ERRORS rejected rows
+        self.done = False
+        
+        try:
+            if path.lower().endswith(('.jsonl', '.ndjson')):
+                self.rows = self.json_rows()
+            else:
+                self.rows = self.csv_rows(csv.reader(self.text))
+        except (ValueError, csv.Error):
+            self.close()
+            raise
+    
+    def csv_rows(self, reader):
+        """(line number, field values) for each CSV row, columns matched by header name"""
+        header = [name.strip().lower() for name in next(reader, [])]
+        missing = [name for name in self.FIELDS[:3] if name not in header]
+        if missing:
+            raise ValueError(f"The CSV header has no {', '.join(missing)} column")
+        columns = [header.index(name) if name in header else None for name in self.FIELDS]
+        
+        def rows():
+            for row in reader:
+                if row:
+                    yield reader.line_num, [row[i] if i is not None and i < len(row) else "" for i in columns]
+        return rows()
+    
+    def json_rows(self):
+        """(line number, field values) for each JSON Lines record; None for unreadable ones"""
+        for line_number, line in enumerate(self.text, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                yield line_number, None
+                continue
+            yield line_number, ["" if data.get(name) is None else str(data[name]) for name in self.FIELDS]
+    
+    def next_batch(self):
+        """Valid WorkoutRecords from up to BATCH_SIZE more rows; sets done at end of file"""
+        batch = []
+        processed = 0
+        for line_number, fields in self.rows:
+            try:
+                if fields is None:
+                    raise ValueError("Not a JSON object")
+                batch.append(validate_workout(*fields))
+            except ValueError as e:
+                self.rejected += 1
+                if len(self.errors) < self.MAX_ERRORS:
+                    self.errors.append((line_number, str(e)))
+            
+            processed += 1
+            if processed >= self.BATCH_SIZE:
+                break
+        else:
+            self.done = True
+        
+        self.imported += len(batch)
+        return batch
+    
+    def bytes_read(self):
+        """How far into the file parsing has got, for the progress bar"""
+        return self.file.tell()
+    
+    def close(self):
+        """Close the import file"""
+        self.text.close()
+
+class DashboardAggregates:
+    """Running totals behind the dashboard, updated one workout at a time"""
+    
+    RECENT_LIMIT = 5
+    
+    def __init__(self):
+        self.week_counts = {}       # (ISO year, ISO week) -> number of workouts
+        self.month_calories = {}    # (year, month) -> calories burned
+        self.recent = []            # min-heap of (day, seq, workout), newest RECENT_LIMIT only
+        self.seq = 0
+    
+    def seed(self, daily_totals, recent_workouts):
+        """Build the totals from per-day sums and the newest workouts"""
+        for day, count, calories, _ in daily_totals:
+            self.add_totals(day, count, calories)
+        
+        # recent_workouts comes newest first; push oldest first so ties keep their order
+        for workout in reversed(recent_workouts):
+            self.add_recent(workout)
+    
+    def add(self, workout):
+        """Account for one newly logged workout"""
+        if workout.day is not None:
+            self.add_totals(workout.day, 1, workout.calories)
+        self.add_recent(workout)
+    
+    def add_totals(self, day, count, calories):
+        """Add count workouts and calories to the week and month of a day number"""
+        when = date.fromordinal(day)
+        week = when.isocalendar()[:2]
+        month = (when.year, when.month)
+        self.week_counts[week] = self.week_counts.get(week, 0) + count
+        self.month_calories[month] = self.month_calories.get(month, 0) + calories
+    
+    def add_recent(self, workout):
+        """Offer a workout to the bounded heap of newest workouts"""
+        self.seq += 1
+        entry = (workout.sort_key(), self.seq, workout)
+        if len(self.recent) < self.RECENT_LIMIT:
+            heapq.heappush(self.recent, entry)
+        else:
+            # Drops whichever is oldest, possibly the new workout itself
+            heapq.heappushpop(self.recent, entry)
+    
+    def workouts_in_week(self, when):
+        """Workouts logged in the ISO week containing the date when"""
+        return self.week_counts.get(when.isocalendar()[:2], 0)
+    
+    def calories_in_month(self, when):
+        """Calories burned in the month containing the date when"""
+        return self.month_calories.get((when.year, when.month), 0)
+    
+    def recent_workouts(self):
+        """The newest workouts, newest first"""
+        return [workout for _, _, workout in sorted(self.recent, reverse=True)]
+
+class IntervalTree:
+    """Centered interval tree answering which [start, end) intervals contain a day"""
+    
+    def __init__(self, intervals=()):
+        self.root = self.build(list(intervals))
+    
+    def build(self, intervals):
+        """Node for (start, end, value) intervals: (center, by_start, by_end, left, right)"""
+        if not intervals:
+            return None
+        
+        # The median endpoint lies inside at least one interval, so every node holds one
+        points = sorted(p for start, end, _ in intervals for p in (start, end - 1))
+        center = points[len(points) // 2]
+        here = [iv for iv in intervals if iv[0] <= center < iv[1]]
+        return (
+            center,
+            sorted(here, key=lambda iv: iv[0]),
+            sorted(here, key=lambda iv: iv[1], reverse=True),
+            self.build([iv for iv in intervals if iv[1] <= center]),
+            self.build([iv for iv in intervals if iv[0] > center])
+        )
+    
+    def stab(self, day):
+        """Values of every interval containing day"""
+        found = []
+        node = self.root
+        while node is not None:
+            center, by_start, by_end, left, right = node
+            if day < center:
+                # Everything here ends after center; only the start can exclude it
+                for start, end, value in by_start:
+                    if start > day:
+                        break
+                    found.append(value)
+                node = left
+            else:
+                for start, end, value in by_end:
+                    if end <= day:
+                        break
+                    found.append(value)
+                node = right
+        return found
+
+class ChallengeProgress:
+    """Running totals for one challenge over its [first_day, end_day) window"""
+    
+    def __init__(self, challenge):
+        self.type = challenge["type"]
+        self.first_day = parse_day(challenge["start_date"])
+        self.end_day = None if self.first_day is None else self.first_day + int(challenge["timeframe"])
+        self.count = 0
+        self.calories = 0
+        self.duration = 0
+        
+        # Streaks: runs of consecutive workout days, looked up from either end
+        self.workout_days = set()
+        self.run_last = {}      # first day of a run -> its last day
+        self.run_first = {}     # last day of a run -> its first day
+        self.longest_streak = 0
+    
+    def add_day(self, day, count, calories, duration):
+        """Fold count workouts done on day into the totals"""
+        self.count += count
+        self.calories += calories
+        self.duration += duration
+        if day in self.workout_days:
+            return
+        
+        # Join the runs ending yesterday and starting tomorrow through today
+        self.workout_days.add(day)
+        first = self.run_first.pop(day - 1, day)
+        last = self.run_last.pop(day + 1, day)
+        self.run_last[first] = last
+        self.run_first[last] = first
+        self.longest_streak = max(self.longest_streak, last - first + 1)
+    
+    def value(self):
+        """Progress towards the target, in the unit of the challenge type"""
+        if self.type == "Workout Count":
+            return self.count
+        elif self.type == "Calorie Goal":
+            return self.calories
+        elif self.type == "Duration Goal":
+            return self.duration
+        elif self.type == "Streak":
+            return self.longest_streak
+        return 0
+
+class ChallengeEngine:
+    """Computes challenge progress from the workout log and keeps it current"""
+    
+    def __init__(self):
+        self.challenges = []
+        self.trackers = []      # ChallengeProgress for each entry in self.challenges
+        self.index = IntervalTree()
+    
+    def load(self, challenges, daily_totals):
+        """Compute progress for every challenge from the store's daily_totals()"""
+        self.challenges = []
+        self.trackers = []
+        for challenge in challenges:
+            self.track(challenge, daily_totals)
+        self.rebuild_index()
+    
+    def add_challenge(self, challenge, daily_totals):
+        """Start tracking a new challenge and return its position"""
+        self.track(challenge, daily_totals)
+        self.rebuild_index()
+        return len(self.challenges) - 1
+    
+    def track(self, challenge, daily_totals):
+        """Seed a challenge from the totals of the days inside its window only"""
+        tracker = ChallengeProgress(challenge)
+        if tracker.first_day is not None:
+            for day, count, calories, duration in daily_totals(tracker.first_day, tracker.end_day):
+                tracker.add_day(day, count, calories, duration)
+        challenge["progress"] = tracker.value()
+        self.challenges.append(challenge)
+        self.trackers.append(tracker)
+    
+    def rebuild_index(self):
+        """Index the challenge windows; challenges are few, so a full rebuild is cheap"""
+        self.index = IntervalTree(
+            (t.first_day, t.end_day, i) for i, t in enumerate(self.trackers)
+            if t.first_day is not None and t.end_day > t.first_day
+        )
+    
+    def add_workout(self, workout):
+        """Count a new workout towards the challenges covering its day; return their positions"""
+        if workout.day is None:
+            return []
+        
+        positions = self.index.stab(workout.day)
+        for i in positions:
+            self.trackers[i].add_day(workout.day, 1, workout.calories, workout.duration)
+            self.challenges[i]["progress"] = self.trackers[i].value()
+        return positions
+
+class WorkoutStats:
+    """Columnar NumPy copy of the workout log behind the Statistics tab"""
+    
+    WEEKS = 12
+    MONTHS = 12
+    TREND_DAYS = 90
+    MOVING_AVERAGE_DAYS = 7
+    PERCENTILES = (25, 50, 75, 90)
+    
+    COLUMNS = ("days", "durations", "calories", "type_codes")
+    
+    def __init__(self, capacity=1024):
+        require_numpy()
+        
+        # Rows are kept in day order so every date window is a searchsorted slice
+        self.size = 0
+        self.in_order = True
+        self.days = np.zeros(capacity, dtype=np.int32)
+        self.durations = np.zeros(capacity)
+        self.calories = np.zeros(capacity)
+        self.type_codes = np.zeros(capacity, dtype=np.int32)
+        self.type_names = []
+        self.type_index = {}
+        
+        # Sorted copies for percentiles; rows past sorted_size are merged in on the next compute
+        self.sorted_size = 0
+        self.sorted_durations = np.zeros(0)
+        self.sorted_calories = np.zeros(0)
+    
+    def load(self, workouts):
+        """Replace the columns with the given WorkoutRecords"""
+        self.size = 0
+        days, durations, calories, type_codes = [], [], [], []
+        for w in workouts:
+            if w.day is not None:
+                days.append(w.day)
+                durations.append(w.duration)
+                calories.append(w.calories)
+                type_codes.append(self.type_code(w.type))
+        
+        n = len(days)
+        self.reserve(n)
+        self.days[:n] = days
+        self.durations[:n] = durations
+        self.calories[:n] = calories
+        self.type_codes[:n] = type_codes
+        self.size = n
+        self.in_order = bool(np.all(self.days[1:n] >= self.days[:n - 1]))
+        
+        self.sorted_durations = np.sort(self.durations[:n])
+        self.sorted_calories = np.sort(self.calories[:n])
+        self.sorted_size = n
+    
+    def add(self, workout):
+        """Append one newly logged workout"""
+        if workout.day is None:
+            return
+        
+        self.reserve(self.size + 1)
+        i = self.size
+        if i and workout.day < self.days[i - 1]:
+            # Back-dated entry; compute() restores day order before it next runs
+            self.in_order = False
+        self.days[i] = workout.day
+        self.durations[i] = workout.duration
+        self.calories[i] = workout.calories
+        self.type_codes[i] = self.type_code(workout.type)
+        self.size += 1
+    
+    def reserve(self, capacity):
+        """Grow the columns geometrically so appends stay amortized O(1)"""
+        if capacity <= len(self.days):
+            return
+        
+        new_capacity = max(capacity, 2 * len(self.days))
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+    
+    def restore_order(self):
+        """Stable-sort every column by day"""
+        order = np.argsort(self.days[:self.size], kind='stable')
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:self.size] = column[:self.size][order]
+        self.in_order = True
+    
+    def type_code(self, name):
+        """Small integer standing in for a workout type"""
+        code = self.type_index.get(name)
+        if code is None:
+            code = self.type_index[name] = len(self.type_names)
+            self.type_names.append(name)
+        return code
+    
+    def window(self, first_day, last_day):
+        """Slice of the rows dated first_day..last_day inclusive"""
+        days = self.days[:self.size]
+        return slice(
+            int(np.searchsorted(days, first_day, 'left')),
+            int(np.searchsorted(days, last_day, 'right'))
+        )
+    
+    @staticmethod
+    def month_numbers(days):
+        """Months since January 1970 for an array of day numbers"""
+        epoch = date(1970, 1, 1).toordinal()
+        return (days - epoch).astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+    
+    def merge_new_rows(self):
+        """Merge the rows appended since the last compute into the sorted copies
+        
+        A full sort or partition of a million rows would blow the time budget on its own.
+        """
+        n = self.size
+        if self.sorted_size < n:
+            self.sorted_durations = self.merge_sorted(self.sorted_durations, self.durations[self.sorted_size:n])
+            self.sorted_calories = self.merge_sorted(self.sorted_calories, self.calories[self.sorted_size:n])
+            self.sorted_size = n
+    
+    @staticmethod
+    def merge_sorted(sorted_values, new_values):
+        """Merge a few new values into an already sorted array"""
+        new_values = np.sort(new_values)
+        return np.insert(sorted_values, np.searchsorted(sorted_values, new_values), new_values)
+    
+    @classmethod
+    def percentiles(cls, sorted_values):
+        """PERCENTILES of a sorted array, interpolated the same way as np.percentile"""
+        n = len(sorted_values)
+        if not n:
+            return np.zeros(len(cls.PERCENTILES))
+        
+        position = np.array(cls.PERCENTILES) / 100 * (n - 1)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, n - 1)
+        return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (position - lo)
+    
+    def compute(self, today):
+        """All the figures the Statistics tab shows, as of the date today"""
+        # The unmerged rows are the tail only until restore_order moves back-dated ones
+        self.merge_new_rows()
+        if not self.in_order:
+            self.restore_order()
+        
+        n = self.size
+        days = self.days[:n]
+        calories = self.calories[:n]
+        durations = self.durations[:n]
+        codes = self.type_codes[:n]
+        today_day = today.toordinal()
+        
+        # Weeks start on Monday, and day number 1 was a Monday
+        first_week = (today_day - 1) // 7 - self.WEEKS + 1
+        rows = self.window(first_week * 7 + 1, (first_week + self.WEEKS) * 7)
+        weeks = (days[rows] - 1) // 7 - first_week
+        weekly_calories = np.bincount(weeks, weights=calories[rows], minlength=self.WEEKS)
+        weekly_counts = np.bincount(weeks, minlength=self.WEEKS)
+        
+        month_starts = [date(today.year, today.month, 1)]
+        for _ in range(self.MONTHS - 1):
+            month_starts.insert(0, (month_starts[0] - timedelta(days=1)).replace(day=1))
+        next_month = (month_starts[-1] + timedelta(days=31)).replace(day=1)
+        rows = self.window(month_starts[0].toordinal(), next_month.toordinal() - 1)
+        months = self.month_numbers(days[rows]) - self.month_numbers(np.array([month_starts[0].toordinal()]))[0]
+        monthly_duration = np.bincount(months, weights=durations[rows], minlength=self.MONTHS)
+        monthly_counts = np.bincount(months, minlength=self.MONTHS)
+        
+        # Moving average of daily calories via a cumulative sum over the trend window
+        span = self.TREND_DAYS + self.MOVING_AVERAGE_DAYS - 1
+        rows = self.window(today_day - span + 1, today_day)
+        daily_calories = np.bincount(days[rows] - (today_day - span + 1), weights=calories[rows], minlength=span)
+        running = np.concatenate(([0.0], np.cumsum(daily_calories)))
+        moving_average = (running[self.MOVING_AVERAGE_DAYS:] - running[:-self.MOVING_AVERAGE_DAYS]) / self.MOVING_AVERAGE_DAYS
+        
+        types = len(self.type_names)
+        return {
+            "total_workouts": n,
+            "week_starts": [date.fromordinal((first_week + i) * 7 + 1) for i in range(self.WEEKS)],
+            "weekly_calories": weekly_calories,
+            "weekly_counts": weekly_counts,
+            "months": month_starts,
+            "monthly_duration": monthly_duration,
+            "monthly_counts": monthly_counts,
+            "moving_average": moving_average,
+            "type_names": list(self.type_names),
+            "type_counts": np.bincount(codes, minlength=types),
+            "type_calories": np.bincount(codes, weights=calories, minlength=types),
+            "type_durations": np.bincount(codes, weights=durations, minlength=types),
+            "duration_percentiles": self.percentiles(self.sorted_durations),
+            "calorie_percentiles": self.percentiles(self.sorted_calories)
+        }
+
+def open_store(backend="sqlite"):
+    """Create and load one of the STORAGE_BACKENDS"""
+    store = STORAGE_BACKENDS[backend]()
+    store.load()
+    return store
+
+def cli_date(text):
+    """argparse type for YYYY-MM-DD dates"""
+    day = parse_day(text)
+    if day is None:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a YYYY-MM-DD date")
+    return date.fromordinal(day)
+
+def command_log(store, args):
+    """Log one workout"""
+    workout = validate_workout(args.date, args.type, args.duration, args.calories, args.notes)
+    store.add_workout(workout)
+    print(f"Logged {workout.duration:g} min of {workout.type} on {workout.date}")
+
+def command_query(store, args):
+    """Print matching workouts as CSV, oldest first"""
+    writer = csv.writer(sys.stdout)
+    writer.writerow(WorkoutImporter.FIELDS)
+    shown = 0
+    for workout in store.workouts_between(args.start, args.end, args.type):
+        if args.limit is not None and shown >= args.limit:
+            break
+        writer.writerow(workout.to_row())
+        shown += 1
+
+def command_summary(store, args):
+    """Print the dashboard figures and challenge progress"""
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    print(f"Workouts logged: {store.workout_count()}")
+    print(f"Workouts this week: {store.count_workouts(week_start, week_start + timedelta(days=6))}")
+    print(f"Calories burned this month: {store.sum_calories(month_start, today):g}")
+    
+    challenges = store.load_challenges()
+    ChallengeEngine().load(challenges, store.daily_totals)
+    for challenge in challenges:
+        print(f"{challenge['name']} ({challenge['type']}): {challenge['progress']:g}/{challenge['target']:g}")
+
+def command_export(store, args):
+    """Write every workout to a CSV or JSON Lines file, or to stdout for -"""
+    out = sys.stdout if args.file == "-" else open(args.file, 'w', newline='')
+    try:
+        if args.file.lower().endswith(('.jsonl', '.ndjson')):
+            for workout in store.all_workouts():
+                out.write(json.dumps(workout.to_dict()) + "\n")
+        else:
+            writer = csv.writer(out)
+            writer.writerow(WorkoutImporter.FIELDS)
+            for workout in store.all_workouts():
+                writer.writerow(workout.to_row())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+def command_import(store, args):
+    """Import a CSV or JSON Lines file, committing after every batch"""
+    importer = WorkoutImporter(args.file)
+    try:
+        while not importer.done:
+            store.add_workouts(importer.next_batch())
+            store.flush()
+    finally:
+        importer.close()
+    
+    print(f"Imported {importer.imported} workouts, skipped {importer.rejected} invalid rows")
+    for line, reason in importer.errors:
+        print(f"  line {line}: {reason}", file=sys.stderr)
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Log, query and export workouts without opening the app")
+    parser.add_argument("--backend", choices=sorted(STORAGE_BACKENDS), default="sqlite",
+                        help="storage backend (default: sqlite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    log = commands.add_parser("log", help="log a workout")
+    log.add_argument("date", help="YYYY-MM-DD")
+    log.add_argument("type", help="e.g. Running")
+    log.add_argument("duration", help="minutes")
+    log.add_argument("--calories", default="")
+    log.add_argument("--notes", default="")
+    log.set_defaults(run=command_log)
+    
+    query = commands.add_parser("query", help="print workouts as CSV")
+    query.add_argument("--from", dest="start", type=cli_date, default=date.min, help="first date, YYYY-MM-DD")
+    query.add_argument("--to", dest="end", type=cli_date, default=date.max, help="last date, YYYY-MM-DD")
+    query.add_argument("--type", help="only workouts of this type")
+    query.add_argument("--limit", type=int, help="print at most this many")
+    query.set_defaults(run=command_query)
+    
+    summary = commands.add_parser("summary", help="show this week's and month's totals and challenge progress")
+    summary.set_defaults(run=command_summary)
+    
+    export = commands.add_parser("export", help="export every workout")
+    export.add_argument("file", help="a .csv or .jsonl file, or - for CSV on stdout")
+    export.set_defaults(run=command_export)
+    
+    import_ = commands.add_parser("import", help="import workouts from a .csv or .jsonl file")
+    import_.add_argument("file")
+    import_.set_defaults(run=command_import)
+    
+    args = parser.parse_args(argv)
+    store = STORAGE_BACKENDS[args.backend]()
+    try:
+        store.load()
+        args.run(store, args)
+        store.flush()
+    except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
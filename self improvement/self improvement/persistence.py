@@ -0,0 +1,135 @@
+"""Disk writes shared by the apps, usable without Tk
+
+PersistenceWorker runs saves on a background thread so the Tk main loop never waits on
+the disk. The helpers below write whole files atomically and append to JSON Lines logs
+durably, so a crash never loses a write that was reported as done.
+"""
+import json
+import os
+import threading
+import time
+
+class PersistenceWorker(threading.Thread):
+    """Write-behind thread that keeps disk writes off the Tk main loop"""
+    
+    # Saves submitted within this many seconds of each other are coalesced
+    COALESCE_DELAY = 0.2
+    
+    def __init__(self, root, on_error):
+        super().__init__(daemon=True)
+        self.root = root
+        self.on_error = on_error
+        self.pending = {}       # key -> save callable; a newer save replaces a queued one
+        self.condition = threading.Condition()
+        self.closing = False
+        self.exit_errors = []
+        self.start()
+    
+    def submit(self, key, save):
+        """Queue save() to run on the worker, replacing any queued save with the same key"""
+        with self.condition:
+            self.pending[key] = save
+            self.condition.notify()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closing:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                # Give rapid follow-up saves a chance to land in the same write; each
+                # submit() notifies, so keep waiting until the window has really passed
+                deadline = time.monotonic() + self.COALESCE_DELAY
+                while not self.closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                saves = list(self.pending.values())
+                self.pending.clear()
+            
+            for save in saves:
+                try:
+                    save()
+                except Exception as e:
+                    if self.closing:
+                        self.exit_errors.append(e)
+                    else:
+                        self.root.after(0, self.on_error, e)
+    
+    def close(self):
+        """Write everything still queued, stop the thread and return any errors"""
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.join()
+        return self.exit_errors
+
+def write_atomically(path, text):
+    """Replace path with text so a crash never leaves a half-written file"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_json_atomically(path, data):
+    """Replace path with data as JSON so a crash never leaves a half-written file"""
+    write_atomically(path, json.dumps(data))
+
+def append_lines(path, lines):
+    """Append lines to path and make sure they have reached the disk"""
+    with open(path, 'a') as f:
+        f.write("".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+def write_pending(owner, write):
+    """Hand owner.pending, which other threads add to under owner.lock, to write()
+    
+    Returns how many items were written. If write() fails they are queued again, ahead
+    of anything added meanwhile, so the next flush retries them in order.
+    """
+    with owner.lock:
+        items, owner.pending = owner.pending, []
+    if not items:
+        return 0
+    
+    try:
+        write(items)
+    except OSError:
+        with owner.lock:
+            owner.pending[:0] = items
+        raise
+    return len(items)
+
+def read_json_lines(path):
+    """Return the records of a JSON Lines log, cutting off a tail torn by a crash
+    
+    A crash mid-append leaves a partial last line; unless it is removed the next append
+    lands on the end of it and is lost with it. Unreadable lines further up, left by
+    versions that did not truncate, are skipped.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records
+    
+    good_end = 0
+    end = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            end += len(line)
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete record")
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+            good_end = end
+    
+    if good_end != end:
+        with open(path, 'r+b') as f:
+            f.truncate(good_end)
+    return records
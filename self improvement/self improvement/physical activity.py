@@ -1,17 +1,26 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime
-import json
+from tkinter import ttk, messagebox, filedialog
+from datetime import date, datetime
+import csv
 import os
+import sqlite3
+
+from fitness_core import (
+    STORAGE_BACKENDS, ChallengeEngine, DashboardAggregates, WorkoutImporter, WorkoutStats,
+    parse_day, validate_workout
+)
+from persistence import PersistenceWorker
 
 class FitnessTracker:
-    def __init__(self, root):
+    def __init__(self, root, backend="sqlite"):
         self.root = root
         self.root.title("Fitness Tracker Pro")
         self.root.geometry("900x600")
         
         # Initialize data
-        self.workouts = []
+        self.store = STORAGE_BACKENDS[backend]()
+        self.aggregates = DashboardAggregates()
+        self.challenge_engine = ChallengeEngine()
         self.challenges = []
         self.settings = {
             "default_location": "Gym",
@@ -20,53 +29,65 @@ class FitnessTracker:
         }
         self.load_data()
         
+        self.importer = None
+        self.stats = None
+        self.stats_loaded = False
+        
+        # Disk writes happen on a background thread so the UI never waits on fsync
+        self.writer = PersistenceWorker(root, self.on_save_error)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Create main notebook (tabs)
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill='both', expand=True)
         
-        # Create tabs
-        self.create_dashboard_tab()
-        self.create_workout_tab()
-        self.create_challenges_tab()
-        self.create_stats_tab()
-        self.create_settings_tab()
+        # Create tabs; only the dashboard is built now, the rest the first time they are shown
+        self.tab_builders = {}
+        self.dashboard_tab = self.add_tab("Dashboard", self.create_dashboard_tab)
+        self.workout_tab = self.add_tab("Log Workout", self.create_workout_tab)
+        self.challenges_tab = self.add_tab("Challenges", self.create_challenges_tab)
+        self.stats_tab = self.add_tab("Statistics", self.create_stats_tab)
+        self.settings_tab = self.add_tab("Settings", self.create_settings_tab)
+        self.build_tab(self.dashboard_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Update dashboard initially
         self.update_dashboard()
     
     def load_data(self):
-        """Load saved data from files"""
+        """Load saved data through the storage backend"""
         try:
-            if os.path.exists('workouts.json'):
-                with open('workouts.json', 'r') as f:
-                    self.workouts = json.load(f)
-            
-            if os.path.exists('challenges.json'):
-                with open('challenges.json', 'r') as f:
-                    self.challenges = json.load(f)
-                    
-            if os.path.exists('settings.json'):
-                with open('settings.json', 'r') as f:
-                    self.settings = json.load(f)
-        except:
+            self.store.load()
+            self.challenges = self.store.load_challenges()
+            self.challenge_engine.load(self.challenges, self.store.daily_totals)
+            self.settings.update(self.store.load_settings())
+            self.aggregates.seed(
+                self.store.daily_totals(),
+                self.store.recent_workouts(DashboardAggregates.RECENT_LIMIT)
+            )
+        except (OSError, ValueError):
             pass
     
     def save_data(self):
-        """Save data to files"""
-        with open('workouts.json', 'w') as f:
-            json.dump(self.workouts, f)
-        
-        with open('challenges.json', 'w') as f:
-            json.dump(self.challenges, f)
-            
-        with open('settings.json', 'w') as f:
-            json.dump(self.settings, f)
+        """Queue a flush of the storage backend on the persistence thread"""
+        self.writer.submit("store", self.store.flush)
+    
+    def on_save_error(self, error):
+        """Report a background save that failed; the changes stay queued for the next one"""
+        messagebox.showerror("Error", f"Could not save your data: {error}")
+    
+    def on_close(self):
+        """Finish any queued saves before the window goes away"""
+        # One last flush also retries anything an earlier failed save left behind
+        self.save_data()
+        errors = self.writer.close()
+        self.store.close()
+        if errors:
+            messagebox.showerror("Error", f"Some changes could not be saved: {errors[0]}")
+        self.root.destroy()
     
     def create_dashboard_tab(self):
         """Create the dashboard tab"""
-        self.dashboard_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.dashboard_tab, text="Dashboard")
-        
         # Welcome label
         self.welcome_label = ttk.Label(
             self.dashboard_tab, 
@@ -112,9 +133,6 @@ class FitnessTracker:
     
     def create_workout_tab(self):
         """Create the workout logging tab"""
-        self.workout_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.workout_tab, text="Log Workout")
-        
         # Workout form
         self.workout_form_frame = ttk.LabelFrame(self.workout_tab, text="Log New Workout")
         self.workout_form_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -157,6 +175,16 @@ class FitnessTracker:
         )
         self.submit_workout_button.grid(row=5, column=1, padx=5, pady=10, sticky='e')
         
+        # Bulk import
+        self.import_workouts_button = ttk.Button(
+            self.workout_form_frame,
+            text="Import...",
+            command=self.import_workouts
+        )
+        self.import_workouts_button.grid(row=5, column=0, padx=5, pady=10, sticky='w')
+        self.import_progress = ttk.Progressbar(self.workout_form_frame, mode='determinate', length=200)
+        self.import_progress.grid(row=6, column=0, columnspan=2, padx=5, pady=5, sticky='we')
+        
         # Workout history
         self.workout_history_frame = ttk.LabelFrame(self.workout_tab, text="Workout History")
         self.workout_history_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -178,16 +206,28 @@ class FitnessTracker:
         self.workout_history_tree.column('Calories', width=80)
         self.workout_history_tree.column('Notes', width=200)
         
+        # Only the rows that fit on screen exist in the tree; the scrollbar
+        # and mouse wheel page through the store instead of the widget
+        self.history_offset = 0
+        self.history_rows = 10
+        self.workout_history_scrollbar = ttk.Scrollbar(
+            self.workout_history_frame,
+            orient=tk.VERTICAL,
+            command=self.on_history_scroll
+        )
+        self.workout_history_scrollbar.pack(side='right', fill='y', pady=5)
+        
         self.workout_history_tree.pack(fill='both', expand=True, padx=5, pady=5)
+        self.workout_history_tree.bind('<Configure>', self.on_history_resize)
+        self.workout_history_tree.bind('<MouseWheel>', self.on_history_wheel)
+        self.workout_history_tree.bind('<Button-4>', self.on_history_wheel)
+        self.workout_history_tree.bind('<Button-5>', self.on_history_wheel)
         
         # Populate workout history
         self.update_workout_history()
     
     def create_challenges_tab(self):
         """Create the challenges tab"""
-        self.challenges_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.challenges_tab, text="Challenges")
-        
         # Create challenge frame
         self.create_challenge_frame = ttk.LabelFrame(self.challenges_tab, text="Create New Challenge")
         self.create_challenge_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -257,22 +297,24 @@ class FitnessTracker:
     
     def create_stats_tab(self):
         """Create the statistics tab"""
-        self.stats_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.stats_tab, text="Statistics")
-        
-        # TODO: Add charts and detailed statistics
-        ttk.Label(self.stats_tab, text="Workout Statistics (Coming Soon)", font=('Helvetica', 14)).pack(pady=20)
+        self.stats_summary_label = ttk.Label(self.stats_tab, text="", font=('Helvetica', 11), justify='left')
+        self.stats_summary_label.pack(pady=10)
         
-        # Placeholder for future charts
         self.stats_canvas = tk.Canvas(self.stats_tab, bg='white', height=300)
         self.stats_canvas.pack(fill='both', expand=True, padx=10, pady=5)
-        self.stats_canvas.create_text(150, 150, text="Charts and graphs will appear here", fill='gray')
+        
+        # The columns are filled the first time the tab is shown and appended to afterwards
+        try:
+            self.stats = WorkoutStats()
+        except ImportError:
+            self.stats = None
+            self.stats_summary_label.config(text="Install NumPy to see workout statistics")
+            return
+        self.stats_results = None
+        self.stats_canvas.bind('<Configure>', lambda event: self.draw_stats_charts())
     
     def create_settings_tab(self):
         """Create the settings tab"""
-        self.settings_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.settings_tab, text="Settings")
-        
         # General settings frame
         self.general_settings_frame = ttk.LabelFrame(self.settings_tab, text="General Settings")
         self.general_settings_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -314,39 +356,30 @@ class FitnessTracker:
     
     def log_workout(self):
         """Log a new workout"""
-        date = self.workout_date_entry.get()
+        date_str = self.workout_date_entry.get()
         workout_type = self.workout_type_combo.get()
         duration = self.workout_duration_entry.get()
         calories = self.workout_calories_entry.get()
         notes = self.workout_notes_text.get("1.0", tk.END).strip()
         
-        # Validate inputs
-        if not all([date, workout_type, duration]):
-            messagebox.showerror("Error", "Please fill in all required fields (Date, Type, Duration)")
-            return
-            
+        # Validate inputs and build the workout record
         try:
-            duration = float(duration)
-            calories = float(calories) if calories else 0
-        except ValueError:
-            messagebox.showerror("Error", "Duration and Calories must be numbers")
+            workout = validate_workout(date_str, workout_type, duration, calories, notes)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
-            
-        # Add workout to list
-        workout = {
-            "date": date,
-            "type": workout_type,
-            "duration": duration,
-            "calories": calories,
-            "notes": notes
-        }
-        self.workouts.append(workout)
         
         # Save data
+        self.store.add_workout(workout)
         self.save_data()
+        self.aggregates.add(workout)
+        updated_challenges = self.challenge_engine.add_workout(workout)
+        if self.stats is not None and self.stats_loaded:
+            self.stats.add(workout)
         
         # Update UI
-        self.update_workout_history()
+        self.insert_history_row(workout)
+        self.update_challenge_rows(updated_challenges)
         self.update_dashboard()
         
         # Clear form
@@ -356,6 +389,73 @@ class FitnessTracker:
         
         messagebox.showinfo("Success", "Workout logged successfully!")
     
+    def import_workouts(self):
+        """Bulk-import workouts from a CSV or JSON Lines file"""
+        path = filedialog.askopenfilename(
+            title="Import Workouts",
+            filetypes=[("CSV or JSON Lines", "*.csv *.jsonl *.ndjson"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        
+        try:
+            self.importer = WorkoutImporter(path)
+        except (OSError, ValueError, csv.Error) as e:
+            messagebox.showerror("Error", f"Could not import {os.path.basename(path)}: {e}")
+            return
+        
+        self.import_workouts_button.config(state='disabled')
+        self.submit_workout_button.config(state='disabled')
+        self.import_progress.config(maximum=max(self.importer.total_bytes, 1), value=0)
+        self.root.after(0, self.import_next_batch)
+    
+    def import_next_batch(self):
+        """Import one batch, then hand control back to the event loop"""
+        batch = []
+        try:
+            batch = self.importer.next_batch()
+            if batch:
+                self.store.add_workouts(batch)
+        except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+            # A batch the store refused was read but not imported
+            self.importer.imported -= len(batch)
+            self.finish_import(f"The import stopped early: {e}")
+            return
+        
+        if batch:
+            self.save_data()
+            for workout in batch:
+                self.aggregates.add(workout)
+                self.challenge_engine.add_workout(workout)
+        
+        self.import_progress.config(value=self.importer.bytes_read())
+        if self.importer.done:
+            self.finish_import()
+        else:
+            self.root.after(1, self.import_next_batch)
+    
+    def finish_import(self, failure=None):
+        """Refresh the UI once for the whole import and report how it went"""
+        importer, self.importer = self.importer, None
+        importer.close()
+        
+        # The statistics reload from the store the next time their tab is shown
+        self.stats_loaded = False
+        self.update_workout_history()
+        self.update_active_challenges()
+        self.update_dashboard()
+        self.import_workouts_button.config(state='normal')
+        self.submit_workout_button.config(state='normal')
+        
+        summary = f"Imported {importer.imported} workouts."
+        if importer.rejected:
+            summary += f"\nSkipped {importer.rejected} invalid rows:"
+            summary += "".join(f"\n  line {line}: {reason}" for line, reason in importer.errors)
+        if failure:
+            messagebox.showerror("Error", f"{failure}\n{summary}")
+        else:
+            messagebox.showinfo("Import Complete", summary)
+    
     def create_challenge(self):
         """Create a new challenge"""
         name = self.challenge_name_entry.get()
@@ -376,22 +476,33 @@ class FitnessTracker:
             messagebox.showerror("Error", "Target and Timeframe must be numbers")
             return
             
-        # Add challenge to list
+        if timeframe < 1:
+            messagebox.showerror("Error", "Timeframe must be at least 1 day")
+            return
+        
+        start_day = parse_day(start_date)
+        if start_day is None:
+            messagebox.showerror("Error", "Start Date must be in YYYY-MM-DD format")
+            return
+        
+        # Add challenge to list; the engine fills in progress from workouts already logged
         challenge = {
             "name": name,
             "type": challenge_type,
             "target": target,
             "timeframe": timeframe,
-            "start_date": start_date,
+            "start_date": date.fromordinal(start_day).isoformat(),
             "progress": 0
         }
+        position = self.challenge_engine.add_challenge(challenge, self.store.daily_totals)
         self.challenges.append(challenge)
         
         # Save data
+        self.store.add_challenge(challenge)
         self.save_data()
         
         # Update UI
-        self.update_active_challenges()
+        self.active_challenges_tree.insert('', 'end', iid=str(position), values=self.challenge_values(challenge))
         self.update_dashboard()
         
         # Clear form
@@ -407,89 +518,255 @@ class FitnessTracker:
         self.settings["notifications"] = self.notifications_var.get()
         self.settings["theme"] = self.theme_combo.get()
         
+        self.store.save_settings(self.settings)
         self.save_data()
         messagebox.showinfo("Success", "Settings saved successfully!")
     
     def update_workout_history(self):
-        """Update the workout history treeview"""
-        # Clear existing items
-        for item in self.workout_history_tree.get_children():
-            self.workout_history_tree.delete(item)
-            
-        # Add workouts (sorted by date, newest first)
-        sorted_workouts = sorted(self.workouts, key=lambda x: x["date"], reverse=True)
-        for workout in sorted_workouts:
-            self.workout_history_tree.insert('', 'end', values=(
-                workout["date"],
-                workout["type"],
-                workout["duration"],
-                workout["calories"],
-                workout["notes"][:50] + "..." if len(workout["notes"]) > 50 else workout["notes"]
-            ))
+        """Show the window of history rows starting at history_offset"""
+        total = self.store.workout_count()
+        self.history_offset = max(0, min(self.history_offset, total - self.history_rows))
+        workouts = self.store.workouts_page(self.history_offset, self.history_rows)
+        
+        # Reuse the rows already in the tree instead of deleting and re-inserting them
+        items = self.workout_history_tree.get_children()
+        for i, workout in enumerate(workouts):
+            if i < len(items):
+                self.workout_history_tree.item(items[i], values=self.history_values(workout))
+            else:
+                self.workout_history_tree.insert('', 'end', values=self.history_values(workout))
+        if len(items) > len(workouts):
+            self.workout_history_tree.delete(*items[len(workouts):])
+        
+        self.update_history_scrollbar(total)
+    
+    def insert_history_row(self, workout):
+        """Insert a just-logged workout at its sorted position in the history"""
+        position = self.store.workout_position(workout)
+        if position < self.history_offset:
+            # It lands above the window; shift the window so the same rows stay in view
+            self.history_offset += 1
+        elif position < self.history_offset + self.history_rows:
+            self.workout_history_tree.insert(
+                '', position - self.history_offset, values=self.history_values(workout)
+            )
+            items = self.workout_history_tree.get_children()
+            if len(items) > self.history_rows:
+                self.workout_history_tree.delete(items[-1])
+        
+        self.update_history_scrollbar(self.store.workout_count())
+    
+    def history_values(self, workout):
+        """Treeview values for one workout history row"""
+        return (
+            workout.date,
+            workout.type,
+            workout.duration,
+            workout.calories,
+            workout.notes[:50] + "..." if len(workout.notes) > 50 else workout.notes
+        )
+    
+    def update_history_scrollbar(self, total):
+        """Size the scrollbar thumb to the visible share of the whole history"""
+        if total:
+            end = min(self.history_offset + self.history_rows, total)
+            self.workout_history_scrollbar.set(self.history_offset / total, end / total)
+        else:
+            self.workout_history_scrollbar.set(0, 1)
+    
+    def scroll_history_to(self, offset):
+        """Move the history window so its top row is offset"""
+        total = self.store.workout_count()
+        offset = max(0, min(offset, total - self.history_rows))
+        if offset != self.history_offset:
+            self.history_offset = offset
+            self.update_workout_history()
+    
+    def on_history_scroll(self, action, amount, unit=None):
+        """Scrollbar command for the history window"""
+        if action == 'moveto':
+            self.scroll_history_to(int(float(amount) * self.store.workout_count()))
+        elif unit == 'pages':
+            self.scroll_history_to(self.history_offset + int(amount) * self.history_rows)
+        else:
+            self.scroll_history_to(self.history_offset + int(amount))
+    
+    def on_history_wheel(self, event):
+        """Scroll the history window with the mouse wheel"""
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self.scroll_history_to(self.history_offset + step)
+        return 'break'
+    
+    def on_history_resize(self, event):
+        """Materialize as many history rows as fit in the tree's new height"""
+        items = self.workout_history_tree.get_children()
+        bbox = self.workout_history_tree.bbox(items[0]) if items else None
+        if bbox:
+            header_height, row_height = bbox[1], bbox[3]
+        else:
+            header_height, row_height = 25, 20
+        
+        rows = max(1, (event.height - header_height) // row_height)
+        if rows != self.history_rows:
+            self.history_rows = rows
+            self.update_workout_history()
+    
+    def add_tab(self, text, builder):
+        """Add an empty notebook tab whose widgets builder() creates on first show"""
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text=text)
+        self.tab_builders[str(tab)] = builder
+        return tab
+    
+    def build_tab(self, tab):
+        """Create a tab's widgets if that has not happened yet"""
+        builder = self.tab_builders.pop(str(tab), None)
+        if builder is not None:
+            builder()
+    
+    def tab_built(self, tab):
+        """Whether a tab's widgets exist yet"""
+        return str(tab) not in self.tab_builders
+    
+    def on_tab_changed(self, event):
+        """Build a tab the first time it is shown, and refresh the statistics whenever they are"""
+        tab = self.notebook.select()
+        self.build_tab(tab)
+        if tab == str(self.stats_tab) and self.stats is not None:
+            self.update_stats()
+    
+    def update_stats(self):
+        """Recompute the statistics and redraw the charts"""
+        if not self.stats_loaded:
+            self.stats.load(self.store.all_workouts())
+            self.stats_loaded = True
+        
+        results = self.stats_results = self.stats.compute(datetime.now().date())
+        durations = "/".join(f"{p:.0f}" for p in results["duration_percentiles"])
+        calories = "/".join(f"{p:.0f}" for p in results["calorie_percentiles"])
+        self.stats_summary_label.config(text=(
+            f"Total workouts: {results['total_workouts']}\n"
+            f"Duration percentiles (25/50/75/90): {durations} min\n"
+            f"Calorie percentiles (25/50/75/90): {calories}"
+        ))
+        self.draw_stats_charts()
+    
+    def draw_stats_charts(self):
+        """Draw the four statistics charts to fit the canvas"""
+        results = self.stats_results
+        if results is None:
+            return
+        
+        canvas = self.stats_canvas
+        canvas.delete('all')
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        mid_x, mid_y, pad = width / 2, height / 2, 15
+        
+        self.draw_bar_chart(
+            pad, pad, mid_x - pad, mid_y - pad, "Calories per week",
+            [d.strftime("%m/%d") for d in results["week_starts"]], results["weekly_calories"], '#4a90d9'
+        )
+        self.draw_bar_chart(
+            mid_x + pad, pad, width - pad, mid_y - pad, "Minutes per month",
+            [d.strftime("%b") for d in results["months"]], results["monthly_duration"], '#7cb342'
+        )
+        self.draw_line_chart(
+            pad, mid_y + pad, mid_x - pad, height - pad,
+            f"Daily calories, {WorkoutStats.MOVING_AVERAGE_DAYS}-day average", results["moving_average"], '#e53935'
+        )
+        self.draw_bar_chart(
+            mid_x + pad, mid_y + pad, width - pad, height - pad, "Calories by type",
+            results["type_names"], results["type_calories"], '#8e24aa'
+        )
+    
+    def draw_bar_chart(self, x0, y0, x1, y1, title, labels, values, color):
+        """Bar chart of values inside the box (x0, y0)-(x1, y1)"""
+        canvas = self.stats_canvas
+        canvas.create_text((x0 + x1) / 2, y0, text=title, anchor='n', font=('Helvetica', 10, 'bold'))
+        top, bottom = y0 + 20, y1 - 15
+        peak = max(max(values, default=0), 1)
+        slot = (x1 - x0) / max(len(values), 1)
+        for i, (label, value) in enumerate(zip(labels, values)):
+            left, right = x0 + (i + 0.15) * slot, x0 + (i + 0.85) * slot
+            canvas.create_rectangle(left, bottom - (bottom - top) * value / peak, right, bottom, fill=color, outline='')
+            canvas.create_text((left + right) / 2, bottom + 2, text=label, anchor='n', font=('Helvetica', 7))
+        canvas.create_line(x0, bottom, x1, bottom, fill='gray')
+    
+    def draw_line_chart(self, x0, y0, x1, y1, title, values, color):
+        """Line chart of values inside the box (x0, y0)-(x1, y1)"""
+        canvas = self.stats_canvas
+        canvas.create_text((x0 + x1) / 2, y0, text=title, anchor='n', font=('Helvetica', 10, 'bold'))
+        top, bottom = y0 + 20, y1 - 15
+        peak = max(max(values, default=0), 1)
+        step = (x1 - x0) / max(len(values) - 1, 1)
+        points = []
+        for i, value in enumerate(values):
+            points.extend((x0 + i * step, bottom - (bottom - top) * value / peak))
+        if len(points) >= 4:
+            canvas.create_line(*points, fill=color, width=2)
+        canvas.create_line(x0, bottom, x1, bottom, fill='gray')
     
     def update_active_challenges(self):
         """Update the active challenges treeview"""
+        if not self.tab_built(self.challenges_tab):
+            return
         # Clear existing items
         for item in self.active_challenges_tree.get_children():
             self.active_challenges_tree.delete(item)
             
-        # Add challenges
-        for challenge in self.challenges:
-            # Calculate end date (simple implementation)
-            start_date = datetime.strptime(challenge["start_date"], "%Y-%m-%d")
-            end_date = start_date + timedelta(days=challenge["timeframe"])
-            
-            self.active_challenges_tree.insert('', 'end', values=(
-                challenge["name"],
-                challenge["type"],
-                challenge["target"],
-                f"{challenge['progress']}/{challenge['target']}",
-                end_date.strftime("%Y-%m-%d")
-            ))
+        # Add challenges; the iid is the challenge's position so single rows can be updated
+        for i, challenge in enumerate(self.challenges):
+            self.active_challenges_tree.insert('', 'end', iid=str(i), values=self.challenge_values(challenge))
+    
+    def update_challenge_rows(self, positions):
+        """Refresh only the rows of challenges whose progress changed"""
+        if not self.tab_built(self.challenges_tab):
+            return
+        for i in positions:
+            self.active_challenges_tree.item(str(i), values=self.challenge_values(self.challenges[i]))
+    
+    def challenge_values(self, challenge):
+        """Treeview values for one challenge row"""
+        start_day = parse_day(challenge["start_date"])
+        if start_day is None:
+            end_date = ""
+        else:
+            end_date = date.fromordinal(start_day + int(challenge["timeframe"]) - 1).isoformat()
+        
+        return (
+            challenge["name"],
+            challenge["type"],
+            challenge["target"],
+            f"{challenge['progress']:g}/{challenge['target']:g}",
+            end_date
+        )
     
     def update_dashboard(self):
         """Update the dashboard with current stats"""
-        # Workouts this week (simple count)
-        workouts_this_week = len([w for w in self.workouts if self.is_this_week(w["date"])])
+        today = datetime.now().date()
+        
+        # Workouts this week
+        workouts_this_week = self.aggregates.workouts_in_week(today)
         self.workouts_count_label.config(text=f"Workouts this week: {workouts_this_week}")
         
         # Active challenges
         active_challenges = len(self.challenges)
         self.active_challenges_label.config(text=f"Active challenges: {active_challenges}")
         
-        # Calories this month (simple sum)
-        calories_this_month = sum(w["calories"] for w in self.workouts if self.is_this_month(w["date"]))
+        # Calories this month
+        calories_this_month = self.aggregates.calories_in_month(today)
         self.calories_burned_label.config(text=f"Calories burned this month: {calories_this_month}")
         
         # Recent workouts (last 5)
         self.recent_workouts_tree.delete(*self.recent_workouts_tree.get_children())
-        recent_workouts = sorted(self.workouts, key=lambda x: x["date"], reverse=True)[:5]
-        for workout in recent_workouts:
+        for workout in self.aggregates.recent_workouts():
             self.recent_workouts_tree.insert('', 'end', values=(
-                workout["date"],
-                workout["type"],
-                workout["duration"],
-                workout["calories"]
+                workout.date,
+                workout.type,
+                workout.duration,
+                workout.calories
             ))
     
-    def is_this_week(self, date_str):
-        """Check if a date is in the current week (simplified)"""
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            today = datetime.now()
-            return date.isocalendar()[1] == today.isocalendar()[1] and date.year == today.year
-        except:
-            return False
-    
-    def is_this_month(self, date_str):
-        """Check if a date is in the current month (simplified)"""
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            today = datetime.now()
-            return date.month == today.month and date.year == today.year
-        except:
-            return False
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = FitnessTracker(root)
@@ -1,65 +1,22 @@
 import tkinter as tk
 from tkinter import messagebox
+import time
 
-quiz_data = [
-    {
-        "question": "What is a growth mindset?",
-        "choices": ["Believing abilities are fixed", "Believing skills can improve with effort", "Avoiding challenges", "Only focusing on natural talent"],
-        "answer": "Believing skills can improve with effort"
-    },
-    {
-        "question": "What should you do when you fail at something?",
-        "choices": ["Give up", "Blame others", "Hide your failure", "Learn from failure and try again"],
-        "answer": "Learn from failure and try again"
-    },
-    {
-        "question": "Why is setting goals important?",
-        "choices": ["It limits your potential", "It makes failure", "It gives direction and motivation", "It's only useful for athletes"],
-        "answer": "It gives direction and motivation"
-    },
-    {
-        "question": "Intelligence is fixed and cannot change.",
-        "choices": ["True", "False"],
-        "answer": "False"
-    },
-    {
-        "question": "Revisiting your progress weekly helps stay on track.",
-        "choices": ["True", "False"],
-        "answer": "True"
-    },
-    {
-        "question": "Breaking tasks into smaller steps makes them easier.",
-        "choices": ["True", "False"],
-        "answer": "True"
-    },
-    {
-        "question": "How can you improve self-confidence?",
-        "choices": ["Celebrating small wins", "Comparing yourself to others", "Avoiding challenges", "Focusing only on weaknesses"],
-        "answer": "Celebrating small wins"
-    },
-    {
-        "question": "Why is sleep important for learning?",
-        "choices": ["It wastes time", "It helps to memorize", "It reduces focus", "It makes you lazy"],
-        "answer": "It helps to memorize"
-    },
-    {
-        "question": "Deep breathing reduces anxiety.",
-        "choices": ["True", "False"],
-        "answer": "True"
-    },
-    {
-        "question": "Failure means you should give up.",
-        "choices": ["True", "False"],
-        "answer": "False"
-    }
-]
+from quiz_engine import AttemptLog, LatencyHistogram, QuestionBank, QuizSession, ReviewScheduler
 
 class QuizApp:
-    def __init__(self, root):
+    """Tk view over a QuizSession, which does the picking, checking and scoring"""
+    
+    def __init__(self, root, session, title="Growth Mindset Quiz"):
         self.root = root
-        self.root.title("Growth Mindset Quiz")
-        self.current_question = 0
-        self.score = 0
+        self.root.title(title)
+        self.session = session
+        
+        # Timing of the view: when the question became visible, and how long show_question
+        # took to get it there
+        self.shown_at = None
+        self.render_time = None
+        self.render_times = LatencyHistogram()
         
         self.question_label = tk.Label(root, text="", wraplength=400, font=("Arial", 12))
         self.question_label.pack(pady=20)
@@ -83,9 +40,11 @@ class QuizApp:
     
     def show_question(self):
         self.feedback_label.config(text="")
-        if self.current_question < len(quiz_data):
-            question_data = quiz_data[self.current_question]
-            self.question_label.config(text=f"Q{self.current_question+1}: {question_data['question']}")
+        question_data = self.session.next_question()
+        
+        if question_data is not None:
+            render_start = time.perf_counter()
+            self.question_label.config(text=f"Q{len(self.session.question_ids)}: {question_data['question']}")
             
             # Hide extra radio buttons for True/False questions
             for i in range(4):
@@ -97,9 +56,20 @@ class QuizApp:
                     self.radio_buttons[i].pack_forget()
             
             self.radio_var.set("")
+            
+            # Draw now, so the answer clock starts when the question is actually visible
+            self.root.update_idletasks()
+            self.shown_at = time.perf_counter()
+            self.render_time = self.shown_at - render_start
+            self.render_times.add(self.render_time)
+        elif not self.session.question_ids:
+            messagebox.showinfo("Quiz Complete", "Nothing is due for review today. Come back tomorrow!")
+            self.root.destroy()
         else:
             messagebox.showinfo("Quiz Complete", 
-                              f"Your score: {self.score}/{len(quiz_data)}")
+                              f"Your score: {self.session.score}/{len(self.session.question_ids)}\n\n"
+                              f"Time to answer: {self.session.answer_times.summary()}\n"
+                              f"Screen updates: {self.render_times.summary('ms')}")
             self.root.destroy()
     
     def check_answer(self):
@@ -107,21 +77,23 @@ class QuizApp:
             self.feedback_label.config(text="Please select an answer!")
             return
             
-        if self.radio_var.get() == quiz_data[self.current_question]["answer"]:
-            self.score += 1
+        latency = time.perf_counter() - self.shown_at
+        if self.session.answer(self.radio_var.get(), latency, self.render_time):
             self.feedback_label.config(text="Correct!", fg="green")
             self.next_button.config(text="Next", command=self.next_question)
         else:
-            self.feedback_label.config(text="Try again! " + quiz_data[self.current_question]["answer"], fg="red")
+            self.feedback_label.config(text="Try again! " + self.session.question["answer"], fg="red")
             self.next_button.config(text="Next", command=self.next_question)
     
     def next_question(self):
-        self.current_question += 1
         self.next_button.config(text="Submit", command=self.check_answer)
         self.show_question()
 
-root = tk.Tk()
-root.geometry("500x400")
-app = QuizApp(root)
-root.mainloop()
-
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.geometry("500x400")
+    bank = QuestionBank().open()
+    # Questions due for review come first, then ones never asked; each is read from the
+    # bank only when it comes up
+    app = QuizApp(root, QuizSession(bank, ReviewScheduler(bank).load(), AttemptLog()))
+    root.mainloop()
@@ -0,0 +1,210 @@
+"""Per-question difficulty, per-topic accuracy and answer times from the quiz attempt log
+
+The log is read once into NumPy columns and every figure is a vectorized pass over
+them, so large logs are summarized in one go:
+    
+    python quiz_analytics.py
+    python quiz_analytics.py --hardest 20 quiz_attempts.jsonl
+    python quiz_analytics.py --histograms --sessions 5
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from quiz_engine import ATTEMPT_FILE, BANK_FILE, QuestionBank
+
+PERCENTILES = (50, 90, 99)
+
+class AttemptStats:
+    """Columns of the attempt log with the aggregations over them"""
+    
+    def __init__(self, question, topic, correct, latency, topics, render=None, session=None, sessions=()):
+        self.question = question    # question id of each attempt
+        self.topic = topic          # index into topics of each attempt
+        self.correct = correct
+        self.latency = latency      # seconds from the question being shown to the answer
+        self.topics = topics
+        # Seconds show_question took to draw the question; NaN for attempts logged before it was measured
+        self.render = np.full(len(latency), np.nan) if render is None else render
+        self.session = np.zeros(len(latency), dtype=np.int64) if session is None else session
+        self.sessions = list(sessions)
+    
+    @classmethod
+    def load(cls, path=ATTEMPT_FILE):
+        """Read the log into columns, skipping lines torn by a crash"""
+        question, topic, correct, latency, render, session = [], [], [], [], [], []
+        codes = {}
+        session_codes = {}
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    attempt = json.loads(line)
+                except ValueError:
+                    continue
+                question.append(attempt["question"])
+                topic.append(codes.setdefault(attempt["topic"], len(codes)))
+                correct.append(attempt["correct"])
+                latency.append(attempt["latency"])
+                render.append(attempt.get("render"))
+                session.append(session_codes.setdefault(attempt.get("session", ""), len(session_codes)))
+        
+        return cls(
+            np.array(question, dtype=np.int64),
+            np.array(topic, dtype=np.int64),
+            np.array(correct, dtype=bool),
+            np.array(latency, dtype=np.float64),
+            list(codes),
+            np.array(render, dtype=np.float64),     # None becomes NaN
+            np.array(session, dtype=np.int64),
+            list(session_codes)
+        )
+    
+    def __len__(self):
+        return len(self.question)
+    
+    def question_difficulty(self):
+        """(question ids, attempts, share answered wrong) for every question attempted"""
+        attempts = np.bincount(self.question)
+        right = np.bincount(self.question, weights=self.correct)
+        ids = np.flatnonzero(attempts)
+        return ids, attempts[ids], 1 - right[ids] / attempts[ids]
+    
+    def topic_accuracy(self):
+        """(topic names, attempts, share answered right) per topic"""
+        attempts = np.bincount(self.topic, minlength=len(self.topics))
+        right = np.bincount(self.topic, weights=self.correct, minlength=len(self.topics))
+        return self.topics, attempts, right / np.maximum(attempts, 1)
+    
+    def latency_percentiles(self, groups=None, percentiles=PERCENTILES):
+        """Answer-time percentiles per group, one row per group and a column per percentile"""
+        return group_percentiles(self.latency, groups, percentiles)
+    
+    def render_percentiles(self, groups=None, percentiles=PERCENTILES):
+        """Percentiles of the time taken to draw each question, over the attempts that measured it
+        
+        With groups there is a row for every group number up to the largest, NaN where
+        none of the group's attempts measured it, so rows line up with the other tables.
+        """
+        measured = ~np.isnan(self.render)
+        if groups is None:
+            return group_percentiles(self.render[measured], None, percentiles)
+        
+        result = np.full((groups.max() + 1, len(percentiles)), np.nan)
+        present = np.bincount(groups[measured], minlength=len(result)) > 0
+        result[present] = group_percentiles(self.render[measured], groups[measured], percentiles)
+        return result
+
+def group_percentiles(values, groups=None, percentiles=PERCENTILES):
+    """Percentiles of values per group, one row per group present and a column per percentile
+    
+    groups gives each value a group number (default: all in one group). Sorting by group
+    and then value puts every group's values in order side by side, so each percentile is
+    an interpolated lookup at the group's offset.
+    """
+    if groups is None:
+        groups = np.zeros(len(values), dtype=np.int64)
+    if not len(values):
+        return np.empty((0, len(percentiles)))
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups)
+    starts = np.cumsum(counts) - counts
+    
+    present = counts > 0
+    counts, starts = counts[present], starts[present]
+    result = np.empty((len(counts), len(percentiles)))
+    for column, percentile in enumerate(percentiles):
+        position = starts + (counts - 1) * (percentile / 100)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        result[:, column] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return result
+
+def histogram(values, unit="s", bins=12, width=40):
+    """Text histogram of positive durations over log-spaced bins"""
+    values = values[values > 0]
+    if not len(values):
+        return ["  no samples"]
+    scale = 1000 if unit == "ms" else 1
+    edges = np.geomspace(values.min(), values.max() * 1.0001, bins + 1)
+    counts, _ = np.histogram(values, edges)
+    bar = width / counts.max()
+    return [
+        f"  {low * scale:9.3f}{unit} - {high * scale:9.3f}{unit}  {count:8d} {'#' * int(round(count * bar))}"
+        for low, high, count in zip(edges[:-1], edges[1:], counts)
+    ]
+
+def format_percentiles(row, unit="s"):
+    if np.isnan(row).all():
+        return "not measured"
+    scale, digits = (1000, 1) if unit == "ms" else (1, 2)
+    return "  ".join(f"p{percentile} {value * scale:.{digits}f}{unit}" for percentile, value in zip(PERCENTILES, row))
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Summarize the quiz attempt log")
+    parser.add_argument("log", nargs="?", default=ATTEMPT_FILE, help=f"attempt log (default: {ATTEMPT_FILE})")
+    parser.add_argument("--hardest", type=int, default=10, help="how many of the hardest questions to list")
+    parser.add_argument("--bank", default=BANK_FILE, help="question bank, for the text of the hardest questions")
+    parser.add_argument("--sessions", type=int, default=5, help="how many of the latest sessions to show")
+    parser.add_argument("--histograms", action="store_true", help="also draw histograms of answer and screen update times")
+    args = parser.parse_args(argv)
+    
+    try:
+        stats = AttemptStats.load(args.log)
+    except OSError as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    if not len(stats):
+        print("No attempts logged yet")
+        return
+    
+    print(f"Attempts: {len(stats)}    Accuracy: {stats.correct.mean() * 100:.1f}%")
+    print(f"Time to answer: {format_percentiles(stats.latency_percentiles()[0])}")
+    render = stats.render_percentiles()
+    if len(render):
+        print(f"Screen updates: {format_percentiles(render[0], 'ms')}")
+    
+    if args.histograms:
+        print("\nTime to answer:")
+        print("\n".join(histogram(stats.latency)))
+        print("\nScreen updates:")
+        print("\n".join(histogram(stats.render[~np.isnan(stats.render)], "ms")))
+    
+    print("\nBy topic:")
+    topics, attempts, accuracy = stats.topic_accuracy()
+    by_topic = stats.latency_percentiles(stats.topic)
+    for i, topic in enumerate(topics):
+        print(f"  {topic or '(none)'}: {accuracy[i] * 100:.1f}% of {attempts[i]}    {format_percentiles(by_topic[i])}")
+    
+    ids, attempts, difficulty = stats.question_difficulty()
+    hardest = np.lexsort((-attempts, -difficulty))[:args.hardest]
+    bank = QuestionBank(args.bank).open() if os.path.exists(args.bank) else None
+    print("\nHardest questions:")
+    for i in hardest:
+        text = bank.get(int(ids[i]))["question"] if bank is not None and int(ids[i]) in bank else ""
+        print(f"  #{ids[i]}: {difficulty[i] * 100:.0f}% wrong of {attempts[i]}  {text}")
+
+    # Slowest questions by median time to answer; rows line up with ids, the questions attempted
+    by_question = stats.latency_percentiles(stats.question)
+    render_by_question = stats.render_percentiles(stats.question)[ids]
+    slowest = np.argsort(-by_question[:, 0], kind="stable")[:args.hardest]
+    print("\nSlowest questions:")
+    for i in slowest:
+        print(f"  #{ids[i]}: {format_percentiles(by_question[i])}    "
+              f"screen {format_percentiles(render_by_question[i], 'ms')}")
+    
+    if args.sessions > 0:
+        sessions = np.arange(len(stats.sessions))[-args.sessions:]
+        attempts = np.bincount(stats.session, minlength=len(stats.sessions))
+        right = np.bincount(stats.session, weights=stats.correct, minlength=len(stats.sessions))
+        answer_times = stats.latency_percentiles(stats.session)
+        render_times = stats.render_percentiles(stats.session)
+        print("\nLatest sessions:")
+        for i in sessions:
+            print(f"  {stats.sessions[i] or '(unknown)'}: {right[i]:.0f}/{attempts[i]}    "
+                  f"{format_percentiles(answer_times[i])}    screen {format_percentiles(render_times[i], 'ms')}")
+
+if __name__ == "__main__":
+    main()
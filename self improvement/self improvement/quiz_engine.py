@@ -0,0 +1,628 @@
+"""Question bank and quiz logic behind the Growth Mindset Quiz, usable without Tk
+
+Questions live in a JSON Lines bank, one question per line:
+    
+    {"id": 12, "topic": "Growth Mindset", "question": "...", "choices": ["...", "..."], "answer": "..."}
+
+The id stays with the question however the file is edited, since the review schedule
+and the attempt log refer to questions by it. A question added by hand without an id
+gets the next free one, written back to the bank, the next time the bank is opened.
+A sidecar index holds the byte offset of every question and the ids of each topic, so
+opening a large bank reads only the index, and a question is parsed only when it is
+asked for.
+
+ReviewScheduler decides which question to ask next with SM-2 spaced repetition,
+AttemptLog records every answer, and LatencyHistogram summarizes how long answers and
+screen updates take. QuizSession runs a round of the quiz on top of them; quiz.py is
+only a view over it.
+
+Run it as a script to take the quiz in the terminal or grade scripted answer sheets:
+    
+    python quiz_engine.py play --topic "Growth Mindset"
+    python quiz_engine.py grade sheets.jsonl > scores.csv
+"""
+from datetime import date, datetime
+import argparse
+import csv
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+
+from persistence import append_lines, read_json_lines, write_atomically
+
+BANK_FILE = "quiz_questions.jsonl"
+REVIEW_FILE = "quiz_reviews.jsonl"
+ATTEMPT_FILE = "quiz_attempts.jsonl"
+
+# Questions asked in one round of the quiz
+QUESTIONS_PER_QUIZ = 10
+
+# The questions the quiz started out with; they seed the bank the first time it is opened.
+# Their ids are the line numbers they had before questions carried ids.
+SEED_QUESTIONS = [
+    {
+        "id": 0,
+        "topic": "Growth Mindset",
+        "question": "What is a growth mindset?",
+        "choices": ["Believing abilities are fixed", "Believing skills can improve with effort", "Avoiding challenges", "Only focusing on natural talent"],
+        "answer": "Believing skills can improve with effort"
+    },
+    {
+        "id": 1,
+        "topic": "Growth Mindset",
+        "question": "What should you do when you fail at something?",
+        "choices": ["Give up", "Blame others", "Hide your failure", "Learn from failure and try again"],
+        "answer": "Learn from failure and try again"
+    },
+    {
+        "id": 2,
+        "topic": "Growth Mindset",
+        "question": "Why is setting goals important?",
+        "choices": ["It limits your potential", "It makes failure", "It gives direction and motivation", "It's only useful for athletes"],
+        "answer": "It gives direction and motivation"
+    },
+    {
+        "id": 3,
+        "topic": "Growth Mindset",
+        "question": "Intelligence is fixed and cannot change.",
+        "choices": ["True", "False"],
+        "answer": "False"
+    },
+    {
+        "id": 4,
+        "topic": "Growth Mindset",
+        "question": "Revisiting your progress weekly helps stay on track.",
+        "choices": ["True", "False"],
+        "answer": "True"
+    },
+    {
+        "id": 5,
+        "topic": "Growth Mindset",
+        "question": "Breaking tasks into smaller steps makes them easier.",
+        "choices": ["True", "False"],
+        "answer": "True"
+    },
+    {
+        "id": 6,
+        "topic": "Growth Mindset",
+        "question": "How can you improve self-confidence?",
+        "choices": ["Celebrating small wins", "Comparing yourself to others", "Avoiding challenges", "Focusing only on weaknesses"],
+        "answer": "Celebrating small wins"
+    },
+    {
+        "id": 7,
+        "topic": "Growth Mindset",
+        "question": "Why is sleep important for learning?",
+        "choices": ["It wastes time", "It helps to memorize", "It reduces focus", "It makes you lazy"],
+        "answer": "It helps to memorize"
+    },
+    {
+        "id": 8,
+        "topic": "Growth Mindset",
+        "question": "Deep breathing reduces anxiety.",
+        "choices": ["True", "False"],
+        "answer": "True"
+    },
+    {
+        "id": 9,
+        "topic": "Growth Mindset",
+        "question": "Failure means you should give up.",
+        "choices": ["True", "False"],
+        "answer": "False"
+    }
+]
+
+class QuestionBank:
+    """A JSON Lines question bank opened through its offset index"""
+    
+    # Bumped whenever the index layout changes, so older indexes are rebuilt
+    INDEX_VERSION = 2
+    
+    def __init__(self, path=BANK_FILE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.offsets = {}       # question id -> byte offset of its line, in bank order
+        self.topics = {}        # topic -> ids of its questions, in bank order
+        self.file = None
+    
+    def open(self, seed=SEED_QUESTIONS):
+        """Open the bank, creating it from seed if it does not exist yet"""
+        if not os.path.exists(self.path):
+            open(self.path, 'a').close()
+            self.add(seed)
+        elif not self.load_index():
+            self.build_index()
+        return self
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    def stamp(self):
+        """What the index was built from; any change to the bank file invalidates it"""
+        stat = os.stat(self.path)
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def load_index(self):
+        """Use the saved index if it still matches the bank; False if it has to be rebuilt"""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if index.get("stamp") != self.stamp() or index.get("version") != self.INDEX_VERSION:
+            return False
+        
+        self.offsets = {question_id: offset for question_id, offset in index["offsets"]}
+        self.topics = index["topics"]
+        return True
+    
+    def build_index(self):
+        """Scan the bank once for ids, line offsets and topics, then save the index"""
+        self.offsets = {}
+        self.topics = {}
+        unnumbered = False
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    question = json.loads(line)
+                    if "id" in question:
+                        self.index_question(question, offset)
+                    else:
+                        unnumbered = True
+                offset += len(line)
+        
+        if unnumbered:
+            self.number_questions()
+            self.build_index()
+        else:
+            self.save_index()
+    
+    def number_questions(self):
+        """Give every question without an id the next free one and rewrite the bank
+        
+        In a bank written before questions had ids that numbers them by line, which is
+        what their ids used to be.
+        """
+        next_id = max(self.offsets, default=-1) + 1
+        lines = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                question = json.loads(line)
+                if "id" not in question:
+                    question = {"id": next_id, **question}
+                    next_id += 1
+                lines.append(json.dumps(question) + "\n")
+        write_atomically(self.path, "".join(lines))
+    
+    def index_question(self, question, offset):
+        """Record where a question's line starts and which topic it is in"""
+        question_id = question["id"]
+        if type(question_id) is not int or question_id < 0:
+            raise ValueError(f"question id {question_id!r} in {self.path} is not a whole number")
+        if question_id in self.offsets:
+            raise ValueError(f"question id {question_id} appears twice in {self.path}")
+        self.offsets[question_id] = offset
+        self.topics.setdefault(question.get("topic", ""), []).append(question_id)
+    
+    def save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "version": self.INDEX_VERSION,
+                "stamp": self.stamp(),
+                "offsets": list(self.offsets.items()),
+                "topics": self.topics
+            }, f)
+        os.replace(tmp_path, self.index_path)
+    
+    def add(self, questions):
+        """Append questions to the bank and the index, giving any without an id the next free one
+        
+        Returns their ids.
+        """
+        self.close()
+        ids = []
+        next_id = max(self.offsets, default=-1) + 1
+        with open(self.path, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            for question in questions:
+                if "id" not in question:
+                    question = {"id": next_id, **question}
+                next_id = max(next_id, question["id"] + 1)
+                self.index_question(question, offset)
+                ids.append(question["id"])
+                line = (json.dumps(question) + "\n").encode("utf-8")
+                f.write(line)
+                offset += len(line)
+        self.save_index()
+        return ids
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def __contains__(self, question_id):
+        return question_id in self.offsets
+    
+    def get(self, question_id):
+        """The question with this id, read from its line of the bank"""
+        if question_id not in self.offsets:
+            raise KeyError(f"no question {question_id} in {self.path}")
+        if self.file is None:
+            self.file = open(self.path, 'rb')
+        self.file.seek(self.offsets[question_id])
+        return json.loads(self.file.readline())
+    
+    def ids(self, topic=None):
+        """Ids of every question, or of one topic's, in bank order"""
+        if topic is None:
+            return list(self.offsets)
+        return self.topics.get(topic, [])
+    
+    def draw(self, count, topic=None, rng=random):
+        """Ids of up to count different questions picked at random, in bank order"""
+        ids = self.ids(topic)
+        return sorted(rng.sample(ids, min(count, len(ids))), key=self.offsets.get)
+
+class ReviewScheduler:
+    """SM-2 spaced repetition over a question bank
+    
+    Each reviewed question has an ease factor, an interval in days, a count of successful
+    reviews in a row and a due day. The latest state of each is appended to a JSON Lines
+    log. Due questions come off a heap ordered by due day, so picking the next review
+    never looks at questions that are not due; questions never reviewed are taken in
+    bank order once nothing is due.
+    """
+    
+    # Rewrite the log once it holds this many records and twice as many as there are cards
+    COMPACT_MIN = 200
+    
+    def __init__(self, bank, path=REVIEW_FILE, topic=None):
+        self.bank = bank
+        self.path = path
+        self.topic = topic
+        self.cards = {}         # question id -> [ease, interval, repetitions, due day]
+        self.heap = []          # (due day, question id); an entry is stale once the card's due day moved
+        self.log_records = 0
+        self.new_ids = None
+    
+    def load(self):
+        """Replay the review log, then queue the cards of this scheduler's topic"""
+        for record in read_json_lines(self.path):
+            self.cards[record["id"]] = [record["ease"], record["interval"], record["repetitions"], record["due"]]
+            self.log_records += 1
+        
+        in_topic = None if self.topic is None else set(self.bank.ids(self.topic))
+        self.heap = [
+            (card[3], question_id) for question_id, card in self.cards.items()
+            if question_id in self.bank and (in_topic is None or question_id in in_topic)
+        ]
+        heapq.heapify(self.heap)
+        self.new_ids = (question_id for question_id in self.bank.ids(self.topic) if question_id not in self.cards)
+        
+        if self.log_records >= max(self.COMPACT_MIN, 2 * len(self.cards)):
+            self.compact()
+        return self
+    
+    def next_due(self, today):
+        """Id of the next question to ask on day number today, or None if there is nothing to review"""
+        while self.heap and self.heap[0][0] <= today:
+            due, question_id = heapq.heappop(self.heap)
+            if self.cards[question_id][3] == due:
+                return question_id
+        return next(self.new_ids, None)
+    
+    def review(self, question_id, quality, today):
+        """Grade a review from 0 (blackout) to 5 (perfect) and schedule the next one"""
+        ease, interval, repetitions, _ = self.cards.get(question_id, [2.5, 0, 0, today])
+        if quality < 3:
+            # Start the question over, but keep the ease it has earned
+            repetitions = 0
+            interval = 1
+        else:
+            repetitions += 1
+            if repetitions == 1:
+                interval = 1
+            elif repetitions == 2:
+                interval = 6
+            else:
+                interval = round(interval * ease)
+        ease = max(1.3, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        
+        card = [ease, interval, repetitions, today + interval]
+        self.cards[question_id] = card
+        heapq.heappush(self.heap, (card[3], question_id))
+        self.append([self.record(question_id, card)])
+        self.log_records += 1
+        return card
+    
+    @staticmethod
+    def record(question_id, card):
+        ease, interval, repetitions, due = card
+        return {"id": question_id, "ease": round(ease, 4), "interval": interval, "repetitions": repetitions, "due": due}
+    
+    def append(self, records):
+        append_lines(self.path, [json.dumps(record) + "\n" for record in records])
+    
+    def compact(self):
+        """Rewrite the log as one record per card"""
+        write_atomically(self.path, "".join(
+            json.dumps(self.record(question_id, card)) + "\n" for question_id, card in self.cards.items()
+        ))
+        self.log_records = len(self.cards)
+
+class AttemptLog:
+    """Every answer given, appended to a JSON Lines log for quiz_analytics.py"""
+    
+    def __init__(self, path=ATTEMPT_FILE):
+        self.path = path
+        # Attempts made in one run of the quiz share a session; the suffix keeps runs
+        # started in the same second apart
+        self.session = f"{datetime.now().isoformat(timespec='seconds')}-{uuid.uuid4().hex[:8]}"
+        self.tail_checked = False
+    
+    def record(self, question, choice, correct, latency, render=None):
+        """Log one answer, the seconds it took and the seconds the question took to draw"""
+        attempt = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "session": self.session,
+            "question": question["id"],
+            "topic": question.get("topic", ""),
+            "choice": choice,
+            "correct": correct,
+            "latency": round(latency, 4),
+            "render": None if render is None else round(render, 6)
+        }
+        if not self.tail_checked:
+            # Cut off a line torn by a crash, or this attempt would be appended onto it
+            read_json_lines(self.path)
+            self.tail_checked = True
+        append_lines(self.path, [json.dumps(attempt) + "\n"])
+        return attempt
+
+class LatencyHistogram:
+    """Counts of durations in log-spaced buckets, so percentiles need no stored samples
+    
+    Each bucket is about 12% wider than the one before, which bounds the error of any
+    percentile to that much whatever the number of samples.
+    """
+    
+    BUCKETS_PER_DECADE = 20
+    SMALLEST = 1e-4         # seconds; anything faster lands in the first bucket
+    
+    def __init__(self):
+        self.counts = {}        # bucket -> samples in it
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def bucket(self, seconds):
+        if seconds <= self.SMALLEST:
+            return 0
+        return math.ceil(math.log10(seconds / self.SMALLEST) * self.BUCKETS_PER_DECADE)
+    
+    def upper_bound(self, bucket):
+        """Largest duration that falls in a bucket"""
+        return self.SMALLEST * 10 ** (bucket / self.BUCKETS_PER_DECADE)
+    
+    def add(self, seconds):
+        bucket = self.bucket(seconds)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, percentile):
+        """Upper bound of the bucket holding the given percentile, capped at the largest sample"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return self.max
+    
+    def rows(self):
+        """(low, high, count) for every bucket that has samples, fastest first"""
+        return [
+            (0.0 if bucket == 0 else self.upper_bound(bucket - 1), self.upper_bound(bucket), self.counts[bucket])
+            for bucket in sorted(self.counts)
+        ]
+    
+    def summary(self, unit="s"):
+        """One line with the count, mean and tail percentiles, in seconds or milliseconds"""
+        if not self.count:
+            return "no samples"
+        scale, digits = (1000, 1) if unit == "ms" else (1, 2)
+        figures = [
+            f"{name} {value * scale:.{digits}f}{unit}"
+            for name, value in [("mean", self.total / self.count)]
+            + [(f"p{p}", self.percentile(p)) for p in (50, 90, 99)] + [("max", self.max)]
+        ]
+        return f"n={self.count}  " + "  ".join(figures)
+
+class QuizSession:
+    """One round of the quiz without any UI: picks the questions, checks answers and keeps score
+    
+    With a scheduler the round asks what is due for review and grades each answer into it;
+    without one it asks questions drawn at random. Answers are logged when attempts is given.
+    """
+    
+    def __init__(self, bank, scheduler=None, attempts=None, topic=None, length=QUESTIONS_PER_QUIZ, today=None):
+        self.bank = bank
+        self.scheduler = scheduler
+        self.attempts = attempts
+        self.length = length
+        self.today = date.today().toordinal() if today is None else today
+        self.drawn = None if scheduler is not None else iter(bank.draw(length, topic))
+        self.question_ids = []  # questions asked so far
+        self.question = None    # the one waiting for an answer
+        self.score = 0
+        self.answer_times = LatencyHistogram()
+    
+    def next_question(self):
+        """The next question to ask, or None once the round is over"""
+        self.question = None
+        if len(self.question_ids) >= self.length:
+            return None
+        
+        if self.scheduler is not None:
+            question_id = self.scheduler.next_due(self.today)
+        else:
+            question_id = next(self.drawn, None)
+        if question_id is None:
+            return None
+        
+        self.question_ids.append(question_id)
+        self.question = self.bank.get(question_id)
+        return self.question
+    
+    def answer(self, choice, latency, render=None):
+        """Check an answer to the current question, given the seconds it took; True if it was right"""
+        question = self.question
+        correct = choice == question["answer"]
+        if correct:
+            self.score += 1
+        self.answer_times.add(latency)
+        
+        if self.attempts is not None:
+            self.attempts.record(question, choice, correct, latency, render)
+        if self.scheduler is not None:
+            # SM-2 grades 0-5: a correct answer counts as recalled, a wrong one as forgotten
+            self.scheduler.review(question["id"], 4 if correct else 1, self.today)
+        return correct
+
+def grade_sheets(bank, sheets):
+    """(name, score, questions answered, invalid answers) for each answer sheet
+    
+    A sheet is {"name": ..., "answers": {question id: choice}}. Each question's answer is
+    read from the bank once, however many sheets answer it. Answers to ids that are not
+    in the bank are counted as invalid instead of being graded. Anything that is not a
+    sheet of that shape, such as None for a line that was not JSON, gives None in place
+    of the three counts, so one bad sheet does not stop the rest.
+    """
+    key = {}
+    for number, sheet in enumerate(sheets, 1):
+        if not isinstance(sheet, dict) or not isinstance(sheet.get("answers"), dict):
+            name = sheet.get("name", str(number)) if isinstance(sheet, dict) else str(number)
+            yield name, None, None, None
+            continue
+        
+        score = 0
+        invalid = 0
+        answers = sheet["answers"]
+        for question_id, choice in answers.items():
+            try:
+                question_id = int(question_id)
+            except ValueError:
+                question_id = -1
+            if question_id not in bank:
+                invalid += 1
+                continue
+            if question_id not in key:
+                key[question_id] = bank.get(question_id)["answer"]
+            if key[question_id] == choice:
+                score += 1
+        yield sheet.get("name", str(number)), score, len(answers) - invalid, invalid
+
+def command_play(bank, args):
+    """Take the quiz in the terminal"""
+    session = QuizSession(bank, ReviewScheduler(bank, topic=args.topic).load(), AttemptLog())
+    while True:
+        question = session.next_question()
+        if question is None:
+            break
+        
+        print(f"\nQ{len(session.question_ids)}: {question['question']}")
+        for number, choice in enumerate(question["choices"], 1):
+            print(f"  {number}. {choice}")
+        
+        shown_at = time.perf_counter()
+        while True:
+            reply = input("Answer: ").strip()
+            if reply.isdigit() and 1 <= int(reply) <= len(question["choices"]):
+                break
+            print("Please select an answer!")
+        latency = time.perf_counter() - shown_at
+        
+        if session.answer(question["choices"][int(reply) - 1], latency):
+            print("Correct!")
+        else:
+            print("Try again! " + question["answer"])
+    
+    if not session.question_ids:
+        print("Nothing is due for review today. Come back tomorrow!")
+        return
+    print(f"\nYour score: {session.score}/{len(session.question_ids)}")
+    print(f"Time to answer: {session.answer_times.summary()}")
+
+def read_sheet(line):
+    """The answer sheet on a line of a sheets file, or None if the line is not JSON"""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+def command_grade(bank, args):
+    """Grade a JSON Lines file of answer sheets, printing a CSV of the scores"""
+    start = time.perf_counter()
+    with open(args.sheets, 'r') as f:
+        sheets = (read_sheet(line) for line in f if line.strip())
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["name", "score", "answered", "invalid"])
+        graded = 0
+        malformed = 0
+        total = 0
+        for name, score, answered, invalid in grade_sheets(bank, sheets):
+            if score is None:
+                malformed += 1
+                continue
+            writer.writerow([name, score, answered, invalid])
+            graded += 1
+            total += score
+    
+    elapsed = time.perf_counter() - start
+    mean = total / graded if graded else 0
+    print(f"Graded {graded} sheets in {elapsed:.2f}s, mean score {mean:.2f}", file=sys.stderr)
+    if malformed:
+        print(f"Skipped {malformed} malformed sheets", file=sys.stderr)
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Take or grade the quiz without opening a window")
+    parser.add_argument("--bank", default=BANK_FILE, help=f"question bank (default: {BANK_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    play = commands.add_parser("play", help="take the quiz in the terminal")
+    play.add_argument("--topic", help="only ask questions on this topic")
+    play.set_defaults(run=command_play)
+    
+    grade = commands.add_parser("grade", help="grade answer sheets")
+    grade.add_argument("sheets", help='a .jsonl file of {"name": ..., "answers": {question id: choice}}')
+    grade.set_defaults(run=command_grade)
+    
+    args = parser.parse_args(argv)
+    bank = QuestionBank(args.bank)
+    try:
+        bank.open()
+        args.run(bank, args)
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    except (EOFError, KeyboardInterrupt):
+        print()
+    finally:
+        bank.close()
+
+if __name__ == "__main__":
+    main()
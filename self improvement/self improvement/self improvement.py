@@ -1,33 +1,634 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+import heapq
 import json
+import math
 import os
+import threading
 import time
 
+from persistence import (
+    PersistenceWorker, append_lines, read_json_lines, write_atomically, write_json_atomically, write_pending
+)
+
+class Challenge:
+    """A challenge of any length; completed days are the bits of an int, day 1 being bit 0"""
+    
+    def __init__(self, challenge_id, name, start_date, length, days=0):
+        self.id = challenge_id
+        self.name = name
+        self.start_date = start_date
+        self.length = length
+        self.days = days
+    
+    def day_number(self, today):
+        """Day of the challenge that today falls on; below 1 before it starts, past length after"""
+        return (today - self.start_date).days + 1
+    
+    def is_complete(self, day):
+        return day >= 1 and (self.days >> (day - 1)) & 1 == 1
+    
+    def mark(self, day):
+        self.days |= 1 << (day - 1)
+    
+    def completed_count(self):
+        return bin(self.days).count("1")
+    
+    def longest_streak(self):
+        """Longest run of completed days; each pass shortens every run by one day"""
+        days = self.days
+        streak = 0
+        while days:
+            days &= days >> 1
+            streak += 1
+        return streak
+    
+    def current_streak(self, day):
+        """Completed days in a row up to day, or up to the day before if day is not done yet"""
+        day = min(day, self.length)
+        if not self.is_complete(day):
+            day -= 1
+        if day < 1:
+            return 0
+        
+        # The highest missed day up to here ends the streak
+        window = (1 << day) - 1
+        missed = ~self.days & window
+        return day - missed.bit_length()
+    
+    def to_record(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "start_date": self.start_date.isoformat(),
+            "length": self.length,
+            "days": format(self.days, "x")
+        }
+    
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            record["id"],
+            record["name"],
+            datetime.strptime(record["start_date"], "%Y-%m-%d").date(),
+            record["length"],
+            int(record["days"], 16)
+        )
+
+class ChallengeStore:
+    """Every challenge in one JSON file, with the completed days of each saved as a hex bitset"""
+    
+    def __init__(self, path="challenge_tracker.json", legacy_path="challenge_data.json"):
+        self.path = path
+        self.legacy_path = legacy_path    # the single 30-day challenge older versions saved
+        self.challenges = {}    # id -> Challenge, in the order they were added
+        self.next_id = 1
+    
+    def load(self):
+        """Read the store, or migrate the legacy file; True if a migration needs saving"""
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            for record in data["challenges"]:
+                challenge = Challenge.from_record(record)
+                self.challenges[challenge.id] = challenge
+            self.next_id = data["next_id"]
+            return False
+        
+        if not os.path.exists(self.legacy_path):
+            return False
+        
+        with open(self.legacy_path, 'r') as f:
+            data = json.load(f)
+        if not data.get('challenge_name') or not data.get('start_date'):
+            return False
+        
+        start_date = datetime.strptime(data['start_date'], "%Y-%m-%d").date()
+        self.add(data['challenge_name'], start_date, 30, data.get('completed_days', []))
+        return True
+    
+    def add(self, name, start_date, length, completed_days=()):
+        """Create a challenge and return it"""
+        challenge = Challenge(self.next_id, name, start_date, length)
+        for day in completed_days:
+            challenge.mark(day)
+        self.challenges[challenge.id] = challenge
+        self.next_id += 1
+        return challenge
+    
+    def delete(self, challenge_id):
+        self.challenges.pop(challenge_id, None)
+    
+    def snapshot(self):
+        """The store as JSON-ready data"""
+        return {
+            "next_id": self.next_id,
+            "challenges": [challenge.to_record() for challenge in self.challenges.values()]
+        }
+
+def goal_status(progress):
+    """Status shown for a goal at this much progress"""
+    if progress <= 0:
+        return "Not Started"
+    elif progress >= 100:
+        return "Completed"
+    return "In Progress"
+
+def parse_target_date(text):
+    """The target date of a goal, or None if it is not a YYYY-MM-DD date"""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+class GoalAnalytics:
+    """Completion rate and progress velocity, kept current one goal change at a time"""
+    
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.velocities = {}    # goal id -> percentage points per day, once it has two updates
+        self.velocity_sum = 0.0
+    
+    def add(self, goal):
+        """Count a goal in its current state"""
+        self.total += 1
+        if goal["progress"] >= 100:
+            self.completed += 1
+        
+        # Velocity over the goal's whole history needs only its first and latest updates
+        history = goal["history"]
+        if len(history) >= 2:
+            first, latest = datetime.fromisoformat(history[0][0]), datetime.fromisoformat(history[-1][0])
+            days = (latest - first).total_seconds() / 86400
+            if days > 0:
+                velocity = (history[-1][1] - history[0][1]) / days
+                self.velocities[goal["id"]] = velocity
+                self.velocity_sum += velocity
+    
+    def remove(self, goal):
+        """Stop counting a goal in the state it was added in"""
+        self.total -= 1
+        if goal["progress"] >= 100:
+            self.completed -= 1
+        self.velocity_sum -= self.velocities.pop(goal["id"], 0.0)
+    
+    def completion_rate(self):
+        """Share of goals that are completed, as a percentage"""
+        return 100 * self.completed / self.total if self.total else 0.0
+    
+    def average_velocity(self):
+        """Mean velocity of the goals that have one, or None"""
+        return self.velocity_sum / len(self.velocities) if self.velocities else None
+    
+    def projected_completion(self, goal):
+        """Date the goal reaches 100% at its current velocity, or None if it is not moving"""
+        velocity = self.velocities.get(goal["id"])
+        if not velocity or velocity <= 0:
+            return None
+        
+        last_update = datetime.fromisoformat(goal["history"][-1][0])
+        return (last_update + timedelta(days=(100 - goal["progress"]) / velocity)).date()
+
+class DeadlineIndex:
+    """Target dates of unfinished goals, kept sorted so deadline queries are binary searches"""
+    
+    def __init__(self):
+        self.entries = []       # (day number, goal id), sorted
+    
+    @staticmethod
+    def deadline(goal):
+        """Day number a goal is due, or None if it is finished or has no valid target date"""
+        target = parse_target_date(goal["date"])
+        if target is None or goal["progress"] >= 100:
+            return None
+        return target.toordinal()
+    
+    def add(self, goal):
+        """Index a goal in its current state"""
+        day = self.deadline(goal)
+        if day is not None:
+            insort(self.entries, (day, goal["id"]))
+    
+    def remove(self, goal):
+        """Drop a goal in the state it was added in"""
+        day = self.deadline(goal)
+        if day is not None:
+            i = bisect_left(self.entries, (day, goal["id"]))
+            if i < len(self.entries) and self.entries[i] == (day, goal["id"]):
+                del self.entries[i]
+    
+    def count_between(self, first_day, end_day):
+        """Number of goals due in [first_day, end_day)"""
+        return bisect_left(self.entries, (end_day,)) - bisect_left(self.entries, (first_day,))
+    
+    def due_between(self, first_day, end_day):
+        """Ids of the goals due in [first_day, end_day), soonest first"""
+        lo = bisect_left(self.entries, (first_day,))
+        hi = bisect_left(self.entries, (end_day,))
+        return [goal_id for _, goal_id in self.entries[lo:hi]]
+    
+    def overdue_count(self, today):
+        """Number of unfinished goals whose target date has passed"""
+        return bisect_left(self.entries, (today,))
+    
+    def next_deadlines(self, today, count):
+        """(day number, goal id) of the next count goals due from today on"""
+        lo = bisect_left(self.entries, (today,))
+        return self.entries[lo:lo + count]
+
+class GoalStore:
+    """Goals indexed by id, persisted as an append-only JSON Lines log"""
+    
+    # Rewrite the log once it holds this many records and twice as many as there are goals
+    COMPACT_MIN = 200
+    
+    def __init__(self, path="goals.jsonl"):
+        self.path = path
+        self.goals = {}         # id -> goal, in the order they were added
+        self.next_id = 1        # ids are never reused, even after deletes
+        self.analytics = GoalAnalytics()
+        self.deadlines = DeadlineIndex()
+        self.log_records = 0
+        self.pending = []       # log lines not yet written; flush() runs on the persistence thread
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Replay the log into the index"""
+        for record in read_json_lines(self.path):
+            self.apply(record)
+            self.log_records += 1
+    
+    def apply(self, record):
+        """Apply one log record to the index and the analytics"""
+        if record["op"] == "put":
+            goal = self.upgrade(record["goal"])
+            old = self.goals.get(goal["id"])
+            if old is not None:
+                self.unindex(old)
+            self.goals[goal["id"]] = goal
+            self.index(goal)
+            self.next_id = max(self.next_id, goal["id"] + 1)
+        elif record["op"] == "progress":
+            goal = self.goals.get(record["id"])
+            if goal is not None:
+                self.unindex(goal)
+                goal["progress"] = record["value"]
+                goal["history"].append([record["at"], record["value"]])
+                self.index(goal)
+        elif record["op"] == "delete":
+            old = self.goals.pop(record["id"], None)
+            if old is not None:
+                self.unindex(old)
+        elif record["op"] == "meta":
+            self.next_id = max(self.next_id, record["next_id"])
+    
+    def index(self, goal):
+        """Add a goal to the analytics and the deadline index"""
+        self.analytics.add(goal)
+        self.deadlines.add(goal)
+    
+    def unindex(self, goal):
+        """Remove a goal from the analytics and the deadline index"""
+        self.analytics.remove(goal)
+        self.deadlines.remove(goal)
+    
+    @staticmethod
+    def upgrade(goal):
+        """Bring a goal saved by an older version up to date"""
+        if isinstance(goal["progress"], str):
+            # Progress used to be stored as text such as "45%", with a separate status
+            goal["progress"] = float(goal["progress"].replace("%", "") or 0)
+        goal.setdefault("history", [])
+        goal.pop("status", None)
+        return goal
+    
+    def get(self, goal_id):
+        """The goal with this id, or None"""
+        return self.goals.get(goal_id)
+    
+    def all(self):
+        """Every goal, in the order they were added"""
+        return list(self.goals.values())
+    
+    def add(self, **fields):
+        """Create a goal with the next free id and no progress, and return it"""
+        goal = {"id": self.next_id}
+        goal.update(fields)
+        goal["progress"] = 0.0
+        goal["history"] = [[datetime.now().isoformat(timespec="seconds"), 0.0]]
+        self.write({"op": "put", "goal": goal})
+        return goal
+    
+    def update(self, goal_id, **fields):
+        """Change fields of a goal other than its progress, and return it"""
+        goal = dict(self.goals[goal_id])
+        goal.update(fields)
+        self.write({"op": "put", "goal": goal})
+        return goal
+    
+    def set_progress(self, goal_id, progress):
+        """Record a new progress value, timestamped in the goal's history"""
+        self.write({
+            "op": "progress",
+            "id": goal_id,
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "value": progress
+        })
+    
+    def delete(self, goal_id):
+        """Remove a goal"""
+        self.write({"op": "delete", "id": goal_id})
+    
+    def write(self, record):
+        """Apply a record and queue it for the next flush"""
+        with self.lock:
+            self.apply(record)
+            self.log(record)
+    
+    def log(self, record):
+        """Queue a record for the next flush; the caller holds the lock"""
+        self.pending.append(json.dumps(record) + "\n")
+    
+    def flush(self):
+        """Append the queued records, rewriting the log once it is mostly stale"""
+        self.log_records += write_pending(self, lambda lines: append_lines(self.path, lines))
+        
+        if self.log_records >= max(self.COMPACT_MIN, 2 * len(self.goals)):
+            self.compact()
+    
+    def compact(self):
+        """Rewrite the log as one record per goal"""
+        with self.lock:
+            lines = [json.dumps({"op": "meta", "next_id": self.next_id}) + "\n"]
+            lines.extend(json.dumps({"op": "put", "goal": goal}) + "\n" for goal in self.goals.values())
+            self.pending = []
+        
+        write_atomically(self.path, "".join(lines))
+        self.log_records = len(lines)
+
+class Countdown:
+    """A countdown kept on the monotonic clock, so changes to the system clock cannot skew it"""
+    
+    def __init__(self, duration):
+        self.duration = duration
+        self.left = duration     # seconds remaining while paused
+        self.deadline = None     # time.monotonic() it ends at while running
+    
+    @property
+    def running(self):
+        return self.deadline is not None
+    
+    def start(self, at=None):
+        """Start, or resume from where it was paused, counting from at (default: now)"""
+        if self.deadline is None:
+            self.deadline = (time.monotonic() if at is None else at) + self.left
+    
+    def pause(self):
+        """Stop the clock, keeping the time remaining"""
+        if self.deadline is not None:
+            self.left = self.remaining()
+            self.deadline = None
+    
+    def remaining(self):
+        """Seconds left, never below zero"""
+        if self.deadline is None:
+            return self.left
+        return max(0.0, self.deadline - time.monotonic())
+
+def until_next_step(remaining, step):
+    """Seconds until a countdown shown rounded up to multiples of step shows its next value"""
+    return remaining - (math.ceil(remaining / step) - 1) * step
+
+def pomodoro_phases(cycles=4, focus=25 * 60, short_break=5 * 60, long_break=15 * 60):
+    """Focus sessions separated by short breaks, ending with a long break"""
+    phases = []
+    for cycle in range(1, cycles + 1):
+        phases.append((f"Focus {cycle}/{cycles}", focus))
+        phases.append(("Long break" if cycle == cycles else "Short break",
+                       long_break if cycle == cycles else short_break))
+    return phases
+
+def interval_phases(rounds, work, rest):
+    """Rounds of work with rest in between"""
+    phases = []
+    for round_number in range(1, rounds + 1):
+        phases.append((f"Work {round_number}/{rounds}", work))
+        if rest and round_number < rounds:
+            phases.append(("Rest", rest))
+    return phases
+
+# Phases that are not counted as focused time
+BREAK_PHASES = ("Short break", "Long break", "Rest")
+
+class PhasedTimer:
+    """A named timer that runs through one or more phases, such as focus and break"""
+    
+    def __init__(self, timer_id, name, phases):
+        self.id = timer_id
+        self.name = name
+        self.phases = phases     # [(label, seconds)]
+        self.phase = 0
+        self.countdown = Countdown(phases[0][1])
+    
+    @property
+    def label(self):
+        return self.phases[self.phase][0]
+    
+    @property
+    def running(self):
+        return self.countdown.running
+    
+    def advance(self):
+        """Move to the next phase, starting it the moment the last one ended; False when none is left"""
+        if self.phase + 1 >= len(self.phases):
+            return False
+        
+        ended = self.countdown.deadline
+        self.phase += 1
+        self.countdown = Countdown(self.phases[self.phase][1])
+        self.countdown.start(at=ended)
+        return True
+    
+    def to_record(self):
+        """JSON-ready state; a running timer is saved by its wall-clock deadline, as the
+        monotonic clock starts over when the computer restarts"""
+        record = {"id": self.id, "name": self.name, "phases": self.phases, "phase": self.phase}
+        if self.running:
+            record["ends_at"] = time.time() + self.countdown.remaining()
+        else:
+            record["left"] = self.countdown.left
+        return record
+    
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild a saved timer; one whose deadline passed while the app was closed is left
+        overdue, so the scheduler catches it up straight away"""
+        timer = cls(record["id"], record["name"], [tuple(phase) for phase in record["phases"]])
+        timer.phase = record["phase"]
+        timer.countdown = Countdown(timer.phases[timer.phase][1])
+        if "ends_at" in record:
+            timer.countdown.deadline = time.monotonic() + (record["ends_at"] - time.time())
+        else:
+            timer.countdown.left = record["left"]
+        return timer
+
+class TimerHistory:
+    """Completed timer phases, appended to a JSON Lines log and totalled by day"""
+    
+    def __init__(self, path="timer_history.jsonl"):
+        self.path = path
+        self.focused = {}       # "YYYY-MM-DD" -> seconds of focused phases completed that day
+        self.pending = []       # log lines not yet written; flush() runs on the persistence thread
+        self.lock = threading.Lock()
+    
+    def load(self):
+        for record in read_json_lines(self.path):
+            self.count(record)
+    
+    def count(self, record):
+        if record["focus"]:
+            day = record["ended"][:10]
+            self.focused[day] = self.focused.get(day, 0) + record["seconds"]
+    
+    def add(self, timer, ended):
+        """Log the phase the timer just finished, which ended at wall-clock time ended"""
+        label, seconds = timer.phases[timer.phase]
+        record = {
+            "timer": timer.name,
+            "phase": label,
+            "seconds": seconds,
+            "ended": datetime.fromtimestamp(ended).isoformat(timespec="seconds"),
+            "focus": label not in BREAK_PHASES
+        }
+        with self.lock:
+            self.pending.append(json.dumps(record) + "\n")
+        self.count(record)
+    
+    def focused_on(self, day):
+        """Seconds of focused time completed on a date"""
+        return self.focused.get(day.isoformat(), 0)
+    
+    def flush(self):
+        """Append the queued records"""
+        write_pending(self, lambda lines: append_lines(self.path, lines))
+
+class TimerScheduler:
+    """Wakes timers up at their deadlines with a single after() job, armed for the earliest one
+    
+    Deadlines sit in a heap. Pausing or removing a timer leaves its entry behind; an entry
+    only counts while its deadline is still the timer's, so stale ones are skipped when they
+    reach the top.
+    """
+    
+    def __init__(self, widget, on_expire):
+        self.widget = widget
+        self.on_expire = on_expire
+        self.heap = []           # (deadline, sequence, timer)
+        self.sequence = 0        # breaks ties so timers themselves are never compared
+        self.job = None
+        self.armed_for = None
+    
+    def schedule(self, timer):
+        """Wake up for a running timer's current deadline"""
+        self.sequence += 1
+        heapq.heappush(self.heap, (timer.countdown.deadline, self.sequence, timer))
+        self.arm()
+    
+    @staticmethod
+    def is_current(entry):
+        deadline, _, timer = entry
+        return timer.countdown.deadline == deadline
+    
+    def arm(self):
+        """Make sure the after() job fires no later than the earliest live deadline"""
+        while self.heap and not self.is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            self.cancel()
+            return
+        
+        deadline = self.heap[0][0]
+        if self.job is not None and self.armed_for <= deadline:
+            return
+        self.cancel()
+        delay = max(1, math.ceil((deadline - time.monotonic()) * 1000))
+        self.job = self.widget.after(delay, self.wake)
+        self.armed_for = deadline
+    
+    def cancel(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+            self.armed_for = None
+    
+    def wake(self):
+        """Expire every timer that is due, then arm for the next deadline"""
+        self.job = None
+        self.armed_for = None
+        now = time.monotonic()
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if self.is_current(entry):
+                self.on_expire(entry[2])
+        self.arm()
+
+def format_duration(seconds):
+    """Seconds as hours and minutes, e.g. 1h 05m"""
+    minutes = int(seconds) // 60
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
 class MultiAppLauncher:
     def __init__(self, root):
         self.root = root
         self.root.title("Productivity Toolkit")
         self.root.geometry("800x600")
         
+        # Disk writes happen on a background thread so the UI never waits on them
+        self.writer = PersistenceWorker(root, self.on_save_error)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
         # Create container frame
         self.container = ttk.Frame(root)
         self.container.pack(fill="both", expand=True)
         
-        # Initialize frames
+        # Frames are built the first time they are shown
         self.frames = {}
-        for F in (MainMenu, ChallengeApp, CountdownTimerApp, GoalTrackerApp):
-            frame = F(self.container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.current = None
+        
+        # Saved timers keep counting down in the background without opening the timer first
+        if os.path.exists(CountdownTimerApp.SESSIONS_FILE):
+            self.get_frame(CountdownTimerApp)
         
         self.show_frame(MainMenu)
     
+    def get_frame(self, cont):
+        """The frame for a page, built on first use"""
+        frame = self.frames.get(cont)
+        if frame is None:
+            frame = cont(self.container, self)
+            self.frames[cont] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+        return frame
+    
     def show_frame(self, cont):
-        frame = self.frames[cont]
+        frame = self.get_frame(cont)
+        self.current = frame
         frame.tkraise()
         frame.event_generate("<<ShowFrame>>")
+    
+    def on_save_error(self, error):
+        """Report a background save that failed"""
+        messagebox.showerror("Error", f"Could not save your data: {error}")
+    
+    def close(self):
+        """Finish any queued saves before the window goes away"""
+        errors = self.writer.close()
+        if errors:
+            messagebox.showerror("Error", f"Some changes could not be saved: {errors[0]}")
+        self.root.destroy()
 
 class MainMenu(ttk.Frame):
     def __init__(self, parent, controller):
@@ -37,7 +638,7 @@ class MainMenu(ttk.Frame):
         label = ttk.Label(self, text="Productivity Toolkit", font=('Arial', 16))
         label.pack(pady=20)
         
-        btn1 = ttk.Button(self, text="30-Day Challenge Tracker",
+        btn1 = ttk.Button(self, text="Challenge Tracker",
                          command=lambda: controller.show_frame(ChallengeApp))
         btn1.pack(fill="x", padx=100, pady=10)
         
@@ -49,10 +650,14 @@ class MainMenu(ttk.Frame):
                          command=lambda: controller.show_frame(GoalTrackerApp))
         btn3.pack(fill="x", padx=100, pady=10)
         
-        quit_btn = ttk.Button(self, text="Exit", command=root.destroy)
+        quit_btn = ttk.Button(self, text="Exit", command=controller.close)
         quit_btn.pack(fill="x", padx=100, pady=30)
 
 class ChallengeApp(ttk.Frame):
+    # Calendar columns: a week per row, or wider rows so long challenges still fit the window
+    WEEK_COLUMNS = 7
+    WIDE_COLUMNS = 25
+    
     def __init__(self, parent, controller):
         ttk.Frame.__init__(self, parent)
         self.controller = controller
@@ -65,50 +670,42 @@ class ChallengeApp(ttk.Frame):
                              command=lambda: controller.show_frame(MainMenu))
         back_btn.pack(side="left", padx=5)
         
-        title_label = ttk.Label(nav_frame, text="30-Day Challenge Tracker", font=('Arial', 12))
+        title_label = ttk.Label(nav_frame, text="Challenge Tracker", font=('Arial', 12))
         title_label.pack(side="left", expand=True)
         
         # Challenge data
-        self.challenge_name = ""
-        self.start_date = None
+        self.store = ChallengeStore()
+        self.challenge = None       # the challenge on display
         self.current_day = 0
-        self.completed_days = []
-        self.data_file = "challenge_data.json"
+        
+        # Calendar cells are created once and restyled in place
+        self.day_cells = []         # (frame, label) per day, including hidden spare ones
+        self.cell_styles = []       # style prefix each cell was last given
+        self.cells_shown = 0
         
         # Load existing data
-        self.load_data()
+        migrated = self.load_data()
         
         # Create GUI
         self.create_widgets()
+        if migrated:
+            self.save_data()
         
         # Update display
+        self.update_challenge_list()
         self.update_display()
     
     def load_data(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.challenge_name = data.get('challenge_name', "")
-                start_date_str = data.get('start_date', "")
-                if start_date_str:
-                    self.start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                self.completed_days = data.get('completed_days', [])
-                
-                if self.start_date:
-                    today = datetime.now().date()
-                    delta = today - self.start_date
-                    self.current_day = delta.days + 1
-                    if self.current_day > 30:
-                        self.current_day = 30
+        migrated = self.store.load()
+        if self.store.challenges:
+            self.challenge = next(reversed(self.store.challenges.values()))
+        return migrated
     
     def save_data(self):
-        data = {
-            'challenge_name': self.challenge_name,
-            'start_date': self.start_date.strftime("%Y-%m-%d") if self.start_date else "",
-            'completed_days': self.completed_days
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f)
+        path = self.store.path
+        # data is a snapshot, so the worker never sees later edits half-applied
+        data = self.store.snapshot()
+        self.controller.writer.submit(path, lambda: write_json_atomically(path, data))
     
     def create_widgets(self):
         # Main frame
@@ -121,18 +718,29 @@ class ChallengeApp(ttk.Frame):
         
         ttk.Label(setup_frame, text="Challenge Name:").grid(row=0, column=0, sticky=tk.W)
         self.name_entry = ttk.Entry(setup_frame, width=40)
-        self.name_entry.grid(row=0, column=1, padx=5)
-        if self.challenge_name:
-            self.name_entry.insert(0, self.challenge_name)
+        self.name_entry.grid(row=0, column=1, columnspan=3, padx=5, sticky=tk.W)
         
         ttk.Label(setup_frame, text="Start Date:").grid(row=1, column=0, sticky=tk.W)
         self.date_entry = ttk.Entry(setup_frame, width=15)
         self.date_entry.grid(row=1, column=1, sticky=tk.W, padx=5)
-        if self.start_date:
-            self.date_entry.insert(0, self.start_date.strftime("%Y-%m-%d"))
+        
+        ttk.Label(setup_frame, text="Length (days):").grid(row=1, column=2, sticky=tk.W)
+        self.length_entry = ttk.Entry(setup_frame, width=6)
+        self.length_entry.grid(row=1, column=3, sticky=tk.W, padx=5)
+        self.length_entry.insert(0, "30")
         
         self.setup_btn = ttk.Button(setup_frame, text="Start Challenge", command=self.setup_challenge)
-        self.setup_btn.grid(row=2, column=0, columnspan=2, pady=5)
+        self.setup_btn.grid(row=2, column=0, columnspan=4, pady=5)
+        
+        # Challenge picker
+        select_frame = ttk.Frame(self.main_frame)
+        select_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(select_frame, text="Challenge:").pack(side=tk.LEFT)
+        self.challenge_combo = ttk.Combobox(select_frame, state="readonly", width=40)
+        self.challenge_combo.pack(side=tk.LEFT, padx=5)
+        self.challenge_combo.bind("<<ComboboxSelected>>", self.on_challenge_selected)
+        self.challenge_ids = []     # challenge id of each combobox entry
         
         # Progress section
         progress_frame = ttk.LabelFrame(self.main_frame, text="Challenge Progress", padding="10")
@@ -156,65 +764,101 @@ class ChallengeApp(ttk.Frame):
                                   command=self.mark_day_complete, state=tk.DISABLED)
         self.mark_btn.pack(pady=5)
         
-        # Reset button
-        ttk.Button(self.main_frame, text="Reset Challenge", command=self.reset_challenge).pack(pady=5)
+        # Delete button
+        ttk.Button(self.main_frame, text="Delete Challenge", command=self.reset_challenge).pack(pady=5)
+    
+    def update_challenge_list(self):
+        challenges = list(self.store.challenges.values())
+        self.challenge_ids = [challenge.id for challenge in challenges]
+        self.challenge_combo['values'] = [
+            f"{challenge.name} ({challenge.length} days from {challenge.start_date})" for challenge in challenges
+        ]
+        if self.challenge is not None:
+            self.challenge_combo.current(self.challenge_ids.index(self.challenge.id))
+        else:
+            self.challenge_combo.set("")
+    
+    def on_challenge_selected(self, event):
+        self.challenge = self.store.challenges[self.challenge_ids[self.challenge_combo.current()]]
+        self.update_display()
     
     def update_display(self):
-        if self.start_date:
-            today = datetime.now().date()
-            delta = today - self.start_date
-            self.current_day = delta.days + 1
+        challenge = self.challenge
+        if challenge:
+            self.current_day = challenge.day_number(datetime.now().date())
+            length = challenge.length
+            completed = challenge.completed_count()
             
             if self.current_day < 1:
                 self.progress_label.config(text="Challenge starts soon!")
                 self.progress_bar['value'] = 0
                 self.mark_btn.config(state=tk.DISABLED)
-            elif self.current_day > 30:
-                self.progress_label.config(text=f"Challenge completed! {len(self.completed_days)}/30 days")
+            elif self.current_day > length:
+                self.progress_label.config(text=f"Challenge completed! {completed}/{length} days")
                 self.progress_bar['value'] = 100
                 self.mark_btn.config(state=tk.DISABLED)
             else:
-                self.progress_label.config(text=f"Day {self.current_day} of 30: {self.challenge_name}")
-                progress = (len(self.completed_days) / 30) * 100
+                self.progress_label.config(text=f"Day {self.current_day} of {length}: {challenge.name}")
+                progress = (completed / length) * 100
                 self.progress_bar['value'] = progress
                 
-                if self.current_day not in self.completed_days:
+                if not challenge.is_complete(self.current_day):
                     self.mark_btn.config(state=tk.NORMAL)
                 else:
                     self.mark_btn.config(state=tk.DISABLED)
             
-            self.day_label.config(text=f"Completed days: {len(self.completed_days)}/30")
-            self.update_calendar()
+            self.day_label.config(
+                text=f"Completed days: {completed}/{length}    "
+                     f"Current streak: {challenge.current_streak(self.current_day)}    "
+                     f"Longest streak: {challenge.longest_streak()}"
+            )
         else:
             self.progress_label.config(text="No active challenge")
             self.progress_bar['value'] = 0
             self.day_label.config(text="")
             self.mark_btn.config(state=tk.DISABLED)
+        self.update_calendar()
     
     def update_calendar(self):
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.start_date:
-            return
+        challenge = self.challenge
+        length = challenge.length if challenge else 0
+        self.show_cells(length)
         
-        for i in range(30):
-            row = i // 7
-            col = i % 7
+        for i in range(length):
             day_num = i + 1
+            if challenge.is_complete(day_num):
+                style = 'Success.'
+            elif day_num == self.current_day:
+                style = 'Current.'
+            else:
+                style = ''
             
+            # Only cells whose state changed are touched
+            if self.cell_styles[i] != style:
+                self.cell_styles[i] = style
+                day_frame, day_label = self.day_cells[i]
+                day_frame.config(style=style + 'TFrame')
+                day_label.config(style=style + 'TLabel')
+    
+    def show_cells(self, length):
+        """Lay out exactly length day cells, creating any that do not exist yet"""
+        while len(self.day_cells) < length:
             day_frame = ttk.Frame(self.calendar_frame, relief=tk.RIDGE, borderwidth=1)
-            day_frame.grid(row=row, column=col, padx=2, pady=2)
-            
-            day_label = ttk.Label(day_frame, text=str(day_num), width=3)
+            day_label = ttk.Label(day_frame, text=str(len(self.day_cells) + 1), width=3)
             day_label.pack()
-            
-            if day_num in self.completed_days:
-                day_frame.config(style='Success.TFrame')
-                day_label.config(style='Success.TLabel')
-            elif day_num == self.current_day and self.current_day <= 30:
-                day_frame.config(style='Current.TFrame')
-                day_label.config(style='Current.TLabel')
+            self.day_cells.append((day_frame, day_label))
+            self.cell_styles.append(None)
+        
+        if length == self.cells_shown:
+            return
+        
+        columns = self.WEEK_COLUMNS if length <= 7 * self.WEEK_COLUMNS else self.WIDE_COLUMNS
+        for i, (day_frame, _) in enumerate(self.day_cells):
+            if i < length:
+                day_frame.grid(row=i // columns, column=i % columns, padx=2, pady=2)
+            else:
+                day_frame.grid_remove()
+        self.cells_shown = length
     
     def setup_challenge(self):
         name = self.name_entry.get().strip()
@@ -235,32 +879,46 @@ class ChallengeApp(ttk.Frame):
             messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD")
             return
         
-        self.challenge_name = name
-        self.start_date = start_date
-        self.completed_days = []
+        try:
+            length = int(self.length_entry.get())
+            if length <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Length must be a positive number of days")
+            return
+        
+        self.challenge = self.store.add(name, start_date, length)
+        self.name_entry.delete(0, tk.END)
+        self.date_entry.delete(0, tk.END)
         self.save_data()
+        self.update_challenge_list()
         self.update_display()
         
         messagebox.showinfo("Success", f"Challenge '{name}' started on {start_date}")
     
     def mark_day_complete(self):
-        if self.current_day not in self.completed_days:
-            self.completed_days.append(self.current_day)
-            self.completed_days.sort()
+        if self.challenge and not self.challenge.is_complete(self.current_day):
+            self.challenge.mark(self.current_day)
             self.save_data()
             self.update_display()
     
     def reset_challenge(self):
-        if messagebox.askyesno("Confirm", "Are you sure you want to reset the challenge?"):
-            self.challenge_name = ""
-            self.start_date = None
-            self.completed_days = []
-            self.name_entry.delete(0, tk.END)
-            self.date_entry.delete(0, tk.END)
+        if self.challenge is None:
+            return
+        
+        if messagebox.askyesno("Confirm", f"Are you sure you want to delete '{self.challenge.name}'?"):
+            self.store.delete(self.challenge.id)
+            self.challenge = next(reversed(self.store.challenges.values()), None)
             self.save_data()
+            self.update_challenge_list()
             self.update_display()
 
 class CountdownTimerApp(ttk.Frame):
+    TIMER_TYPES = ("Countdown", "Pomodoro", "Intervals")
+    
+    # Running and paused timers; only exists while there are any
+    SESSIONS_FILE = "timer_sessions.json"
+    
     def __init__(self, parent, controller):
         ttk.Frame.__init__(self, parent)
         self.controller = controller
@@ -277,12 +935,23 @@ class CountdownTimerApp(ttk.Frame):
         title_label.pack(side="left", expand=True)
         
         # Timer variables
-        self.running = False
-        self.remaining_time = 0
-        self.end_time = 0
+        self.timers = {}         # id -> PhasedTimer, in the order they were started
+        self.next_id = 1
+        self.row_text = {}       # id -> values last written to its row
+        self.scheduler = TimerScheduler(self, self.on_phase_end)
+        self.tick_job = None
+        self.tenths = tk.BooleanVar(value=False)
+        self.history = TimerHistory()
         
         # Create UI elements
         self.create_widgets()
+        self.history.load()
+        self.load_sessions()
+        self.update_focus_label()
+        
+        # Ticks stop while the timer is out of sight and pick up again when it is shown
+        self.bind("<<ShowFrame>>", lambda e: self.refresh())
+        self.winfo_toplevel().bind("<Map>", self.on_map, add="+")
         
     def create_widgets(self):
         # Main container
@@ -293,21 +962,40 @@ class CountdownTimerApp(ttk.Frame):
         input_frame = ttk.Frame(main_frame)
         input_frame.pack(pady=(0, 20))
         
-        ttk.Label(input_frame, text="Hours:").grid(row=0, column=0, padx=5)
+        ttk.Label(input_frame, text="Name:").grid(row=0, column=0, padx=5)
+        self.name_entry = ttk.Entry(input_frame, width=15)
+        self.name_entry.grid(row=0, column=1, padx=5)
+        
+        ttk.Label(input_frame, text="Hours:").grid(row=0, column=2, padx=5)
         self.hours_entry = ttk.Entry(input_frame, width=5)
-        self.hours_entry.grid(row=0, column=1, padx=5)
+        self.hours_entry.grid(row=0, column=3, padx=5)
         self.hours_entry.insert(0, "0")
         
-        ttk.Label(input_frame, text="Minutes:").grid(row=0, column=2, padx=5)
+        ttk.Label(input_frame, text="Minutes:").grid(row=0, column=4, padx=5)
         self.minutes_entry = ttk.Entry(input_frame, width=5)
-        self.minutes_entry.grid(row=0, column=3, padx=5)
+        self.minutes_entry.grid(row=0, column=5, padx=5)
         self.minutes_entry.insert(0, "0")
         
-        ttk.Label(input_frame, text="Seconds:").grid(row=0, column=4, padx=5)
+        ttk.Label(input_frame, text="Seconds:").grid(row=0, column=6, padx=5)
         self.seconds_entry = ttk.Entry(input_frame, width=5)
-        self.seconds_entry.grid(row=0, column=5, padx=5)
+        self.seconds_entry.grid(row=0, column=7, padx=5)
         self.seconds_entry.insert(0, "0")
         
+        ttk.Label(input_frame, text="Type:").grid(row=1, column=0, padx=5, pady=(5, 0))
+        self.type_combo = ttk.Combobox(input_frame, values=self.TIMER_TYPES, state="readonly", width=12)
+        self.type_combo.grid(row=1, column=1, padx=5, pady=(5, 0))
+        self.type_combo.current(0)
+        
+        ttk.Label(input_frame, text="Rounds:").grid(row=1, column=2, padx=5, pady=(5, 0))
+        self.rounds_entry = ttk.Entry(input_frame, width=5)
+        self.rounds_entry.grid(row=1, column=3, padx=5, pady=(5, 0))
+        self.rounds_entry.insert(0, "4")
+        
+        ttk.Label(input_frame, text="Rest (sec):").grid(row=1, column=4, padx=5, pady=(5, 0))
+        self.rest_entry = ttk.Entry(input_frame, width=5)
+        self.rest_entry.grid(row=1, column=5, padx=5, pady=(5, 0))
+        self.rest_entry.insert(0, "30")
+        
         # Timer display
         self.time_display = tk.Label(
             main_frame, 
@@ -315,7 +1003,20 @@ class CountdownTimerApp(ttk.Frame):
             font=("Helvetica", 48),
             fg="black"
         )
-        self.time_display.pack(pady=20)
+        self.time_display.pack(pady=(20, 0))
+        
+        self.phase_label = ttk.Label(main_frame, text="", font=('Arial', 12))
+        self.phase_label.pack(pady=(0, 10))
+        
+        self.focus_label = ttk.Label(main_frame, text="")
+        self.focus_label.pack(pady=(0, 10))
+        
+        ttk.Checkbutton(
+            main_frame,
+            text="Show tenths of a second",
+            variable=self.tenths,
+            command=self.refresh
+        ).pack(pady=(0, 10))
         
         # Button controls
         button_frame = ttk.Frame(main_frame)
@@ -338,94 +1039,278 @@ class CountdownTimerApp(ttk.Frame):
         
         self.reset_button = ttk.Button(
             button_frame, 
-            text="Reset", 
+            text="Remove", 
             command=self.reset_timer,
             state=tk.DISABLED
         )
         self.reset_button.grid(row=0, column=2, padx=5)
         
+        # Running timers
+        columns = ("name", "phase", "remaining")
+        self.timers_tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=6)
+        self.timers_tree.heading("name", text="Timer")
+        self.timers_tree.heading("phase", text="Phase")
+        self.timers_tree.heading("remaining", text="Remaining")
+        self.timers_tree.column("name", width=200)
+        self.timers_tree.column("phase", width=150, anchor=tk.CENTER)
+        self.timers_tree.column("remaining", width=120, anchor=tk.CENTER)
+        self.timers_tree.pack(fill=tk.BOTH, expand=True, pady=(20, 0))
+        self.timers_tree.bind("<<TreeviewSelect>>", lambda e: self.refresh())
+        
         self.update_display()
+    
+    def load_sessions(self):
+        """Bring back the timers that were running or paused when the app last closed"""
+        if not os.path.exists(self.SESSIONS_FILE):
+            return
         
+        with open(self.SESSIONS_FILE, 'r') as f:
+            data = json.load(f)
+        
+        for record in data.get("timers", []):
+            timer = PhasedTimer.from_record(record)
+            self.timers[timer.id] = timer
+            self.next_id = max(self.next_id, timer.id + 1)
+            self.timers_tree.insert("", tk.END, iid=str(timer.id), values=self.timer_values(timer))
+            if timer.running:
+                self.scheduler.schedule(timer)
+        self.refresh()
+    
+    def save_sessions(self):
+        """Write the timers' state; called only when a timer starts, pauses, moves on or ends"""
+        path = self.SESSIONS_FILE
+        if self.timers:
+            # Records are a snapshot, so the worker never sees later changes half-applied
+            data = {"timers": [timer.to_record() for timer in self.timers.values()]}
+            save = lambda: write_json_atomically(path, data)
+        else:
+            def save():
+                if os.path.exists(path):
+                    os.remove(path)
+        self.controller.writer.submit(path, save)
+    
+    def update_focus_label(self):
+        today = datetime.now().date()
+        week = sum(self.history.focused_on(today - timedelta(days=i)) for i in range(7))
+        self.focus_label.config(
+            text=f"Focused today: {format_duration(self.history.focused_on(today))}    "
+                 f"Last 7 days: {format_duration(week)}"
+        )
+        
+    def read_phases(self):
+        """Phases of the timer described by the inputs; raises ValueError if they are invalid"""
+        hours = int(self.hours_entry.get())
+        minutes = int(self.minutes_entry.get())
+        seconds = int(self.seconds_entry.get())
+        
+        if hours < 0 or minutes < 0 or seconds < 0:
+            raise ValueError("Negative values not allowed")
+        if minutes >= 60 or seconds >= 60:
+            raise ValueError("Minutes/seconds must be < 60")
+        
+        duration = hours * 3600 + minutes * 60 + seconds
+        timer_type = self.type_combo.get()
+        
+        if timer_type == "Pomodoro":
+            # The entered time, if any, replaces the standard 25 minute focus session
+            return pomodoro_phases(focus=duration or 25 * 60)
+        
+        if duration <= 0:
+            raise ValueError("Time must be greater than 0")
+        
+        if timer_type == "Intervals":
+            rounds = int(self.rounds_entry.get())
+            rest = int(self.rest_entry.get())
+            if rounds <= 0 or rest < 0:
+                raise ValueError("Rounds must be positive and rest cannot be negative")
+            return interval_phases(rounds, duration, rest)
+        
+        return [("Countdown", duration)]
+    
     def start_timer(self):
-        if self.running:
-            return
-            
         try:
-            hours = int(self.hours_entry.get())
-            minutes = int(self.minutes_entry.get())
-            seconds = int(self.seconds_entry.get())
-            
-            if hours < 0 or minutes < 0 or seconds < 0:
-                raise ValueError("Negative values not allowed")
-            if minutes >= 60 or seconds >= 60:
-                raise ValueError("Minutes/seconds must be < 60")
-                
-            self.remaining_time = hours * 3600 + minutes * 60 + seconds
-            
-            if self.remaining_time <= 0:
-                raise ValueError("Time must be greater than 0")
-                
-            self.end_time = time.time() + self.remaining_time
-            self.running = True
-            self.update_buttons()
-            self.countdown()
-            
+            phases = self.read_phases()
         except ValueError as e:
             messagebox.showerror("Invalid Input", str(e))
+            return
+        
+        timer_type = self.type_combo.get()
+        name = self.name_entry.get().strip() or f"{timer_type} {self.next_id}"
+        timer = PhasedTimer(self.next_id, name, phases)
+        self.next_id += 1
+        self.timers[timer.id] = timer
+        
+        timer.countdown.start()
+        self.scheduler.schedule(timer)
+        
+        iid = str(timer.id)
+        self.timers_tree.insert("", tk.END, iid=iid, values=self.timer_values(timer))
+        self.timers_tree.selection_set(iid)
+        self.name_entry.delete(0, tk.END)
+        self.save_sessions()
+        self.refresh()
+    
+    def selected_timer(self):
+        """The timer picked in the list, or the most recently started one"""
+        selection = self.timers_tree.selection()
+        if selection and int(selection[0]) in self.timers:
+            return self.timers[int(selection[0])]
+        if self.timers:
+            return next(reversed(self.timers.values()))
+        return None
     
     def pause_timer(self):
-        self.running = False
-        self.update_buttons()
+        """Pause the selected timer, or resume it if it is paused"""
+        timer = self.selected_timer()
+        if timer is None:
+            return
+            
+        if timer.running:
+            timer.countdown.pause()
+        else:
+            timer.countdown.start()
+            self.scheduler.schedule(timer)
+        self.save_sessions()
+        self.refresh()
     
     def reset_timer(self):
-        self.running = False
-        self.remaining_time = 0
+        """Stop and remove the selected timer"""
+        timer = self.selected_timer()
+        if timer is None:
+            return
+        
+        self.remove_timer(timer)
+        self.save_sessions()
+        self.time_display.config(fg="black")
+        self.refresh()
+    
+    def remove_timer(self, timer):
+        # Pausing clears the deadline, which makes its scheduler entry stale
+        timer.countdown.pause()
+        del self.timers[timer.id]
+        self.row_text.pop(timer.id, None)
+        if self.timers_tree.exists(str(timer.id)):
+            self.timers_tree.delete(str(timer.id))
+        self.scheduler.arm()
+    
+    def on_phase_end(self, timer):
+        """Called by the scheduler when a timer reaches the end of its current phase"""
+        # The deadline may have passed while the app was closed, so log when it really ended
+        ended = time.time() - (time.monotonic() - timer.countdown.deadline)
+        self.history.add(timer, ended)
+        self.controller.writer.submit(self.history.path, self.history.flush)
+        self.update_focus_label()
+        
+        if timer.advance():
+            self.scheduler.schedule(timer)
+            self.save_sessions()
+            self.bell()
+            self.refresh()
+            return
+        
+        self.remove_timer(timer)
+        self.save_sessions()
+        self.refresh()
+        self.time_display.config(fg="red")
+        self.update_display(finished=True)
+        messagebox.showinfo("Timer Complete", f"{timer.name} has finished!")
+    
+    def visible(self):
+        """Whether the timer is on screen: its frame is raised and the window is not minimized"""
+        return self.controller.current is self and self.winfo_toplevel().state() != "iconic"
+    
+    def on_map(self, event):
+        if event.widget is self.winfo_toplevel():
+            self.refresh()
+    
+    def refresh(self):
+        """Redraw everything and line up the next display tick"""
         self.update_display()
+        self.update_rows()
         self.update_buttons()
-        self.time_display.config(fg="black")
+        self.schedule_tick()
     
-    def countdown(self):
-        if not self.running:
+    def cancel_tick(self):
+        if self.tick_job is not None:
+            self.after_cancel(self.tick_job)
+            self.tick_job = None
+    
+    def schedule_tick(self):
+        """Wake when the shown timer's display next changes; phase ends are the scheduler's job"""
+        self.cancel_tick()
+        timer = self.selected_timer()
+        if timer is None or not self.visible() or not any(t.running for t in self.timers.values()):
             return
             
-        self.remaining_time = max(0, self.end_time - time.time())
-        
-        if self.remaining_time <= 0:
-            self.timer_complete()
+        if timer.running:
+            delay = until_next_step(timer.countdown.remaining(), self.step())
         else:
-            self.update_display()
-            self.after(1000, self.countdown)
+            # The shown timer is paused, so only the list needs ticking
+            delay = self.step()
+        self.tick_job = self.after(max(1, math.ceil(delay * 1000)), self.countdown)
     
-    def timer_complete(self):
-        self.running = False
-        self.remaining_time = 0
+    def countdown(self):
+        self.tick_job = None
         self.update_display()
-        self.update_buttons()
-        self.time_display.config(fg="red")
-        messagebox.showinfo("Timer Complete", "The countdown has finished!")
+        self.update_rows()
+        self.schedule_tick()
     
-    def update_display(self):
-        hours = int(self.remaining_time // 3600)
-        minutes = int((self.remaining_time % 3600) // 60)
-        seconds = int(self.remaining_time % 60)
+    def step(self):
+        return 0.1 if self.tenths.get() else 1
+    
+    def format_time(self, remaining):
+        # Round up, so the display starts at the full duration and reads zero only at the end
+        if self.tenths.get():
+            tenths = math.ceil(remaining * 10)
+            whole, fraction = divmod(tenths, 10)
+        else:
+            whole, fraction = math.ceil(remaining), None
+        
+        hours = whole // 3600
+        minutes = (whole % 3600) // 60
+        seconds = whole % 60
         
         time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        self.time_display.config(text=time_str)
+        if fraction is not None:
+            time_str += f".{fraction}"
+        return time_str
+    
+    def timer_values(self, timer):
+        phase = timer.label if timer.running else f"{timer.label} (paused)"
+        return (timer.name, phase, self.format_time(timer.countdown.remaining()))
+    
+    def update_rows(self):
+        """Rewrite only the rows whose text changed since the last tick"""
+        for timer in self.timers.values():
+            values = self.timer_values(timer)
+            if self.row_text.get(timer.id) != values:
+                self.row_text[timer.id] = values
+                self.timers_tree.item(str(timer.id), values=values)
+    
+    def update_display(self, finished=False):
+        timer = None if finished else self.selected_timer()
+        if timer is None:
+            self.time_display.config(text=self.format_time(0))
+            self.phase_label.config(text="")
+            return
+        
+        self.time_display.config(text=self.format_time(timer.countdown.remaining()), fg="black")
+        self.phase_label.config(text=f"{timer.name}: {timer.label}")
     
     def update_buttons(self):
-        if self.running:
-            self.start_button.config(state=tk.DISABLED)
-            self.pause_button.config(state=tk.NORMAL)
-            self.reset_button.config(state=tk.NORMAL)
+        timer = self.selected_timer()
+        if timer is None:
+            self.pause_button.config(state=tk.DISABLED, text="Pause")
+            self.reset_button.config(state=tk.DISABLED)
         else:
-            self.start_button.config(state=tk.NORMAL)
-            self.pause_button.config(state=tk.DISABLED)
-            if self.remaining_time > 0:
-                self.reset_button.config(state=tk.NORMAL)
-            else:
-                self.reset_button.config(state=tk.DISABLED)
+            self.pause_button.config(state=tk.NORMAL, text="Pause" if timer.running else "Resume")
+            self.reset_button.config(state=tk.NORMAL)
 
 class GoalTrackerApp(ttk.Frame):
+    # How often to look for a new day, which moves goals into "due" and "overdue"
+    DEADLINE_CHECK_MS = 60 * 1000
+    DUE_SOON_DAYS = 7
+    
     def __init__(self, parent, controller):
         ttk.Frame.__init__(self, parent)
         self.controller = controller
@@ -442,10 +1327,17 @@ class GoalTrackerApp(ttk.Frame):
         title_label.pack(side="left", expand=True)
         
         # Initialize data storage
-        self.goals = []
+        self.store = GoalStore()
+        try:
+            self.store.load()
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Could not load your goals: {e}")
         
         # Create UI elements
+        self.today = datetime.now().date().toordinal()
         self.create_widgets()
+        self.update_goals_list()
+        self.after(self.DEADLINE_CHECK_MS, self.check_deadlines)
         
     def create_widgets(self):
         # Main container
@@ -474,7 +1366,7 @@ class GoalTrackerApp(ttk.Frame):
         list_frame.pack(fill=tk.BOTH, expand=True)
         
         # Treeview for goals
-        columns = ("id", "goal", "date", "progress", "status")
+        columns = ("id", "goal", "date", "progress", "status", "due")
         self.goals_tree = ttk.Treeview(
             list_frame, columns=columns, show="headings", selectmode="browse"
         )
@@ -485,12 +1377,14 @@ class GoalTrackerApp(ttk.Frame):
         self.goals_tree.heading("date", text="Target Date")
         self.goals_tree.heading("progress", text="Progress")
         self.goals_tree.heading("status", text="Status")
+        self.goals_tree.heading("due", text="Due")
         
         self.goals_tree.column("id", width=50, anchor=tk.CENTER)
         self.goals_tree.column("goal", width=300)
         self.goals_tree.column("date", width=100, anchor=tk.CENTER)
         self.goals_tree.column("progress", width=100, anchor=tk.CENTER)
         self.goals_tree.column("status", width=100, anchor=tk.CENTER)
+        self.goals_tree.column("due", width=100, anchor=tk.CENTER)
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.goals_tree.yview)
@@ -514,38 +1408,154 @@ class GoalTrackerApp(ttk.Frame):
         update_progress_btn = ttk.Button(btn_frame, text="Update Progress", command=self.update_progress)
         update_progress_btn.pack(side=tk.LEFT, padx=5)
     
+        # Analytics
+        analytics_frame = ttk.LabelFrame(main_frame, text="Analytics")
+        analytics_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.summary_label = ttk.Label(analytics_frame, text="")
+        self.summary_label.pack(anchor=tk.W, padx=5, pady=2)
+        
+        self.deadlines_label = ttk.Label(analytics_frame, text="")
+        self.deadlines_label.pack(anchor=tk.W, padx=5, pady=2)
+        
+        self.selected_label = ttk.Label(analytics_frame, text="Select a goal to see its projection")
+        self.selected_label.pack(anchor=tk.W, padx=5, pady=2)
+        
+        self.goals_tree.bind("<<TreeviewSelect>>", lambda event: self.update_analytics())
+    
     def add_goal(self):
         goal = self.goal_entry.get()
-        date = self.date_entry.get()
+        date = self.date_entry.get().strip()
         
         if not goal:
             messagebox.showerror("Error", "Goal cannot be empty")
             return
+        
+        if date:
+            target = parse_target_date(date)
+            if target is None:
+                messagebox.showerror("Error", "Target date must be in YYYY-MM-DD format")
+                return
+            date = target.isoformat()
             
-        goal_id = len(self.goals) + 1
-        self.goals.append({
-            "id": goal_id,
-            "goal": goal,
-            "date": date,
-            "progress": "0%",
-            "status": "Not Started"
-        })
+        new_goal = self.store.add(goal=goal, date=date)
+        self.save_goals()
         
-        self.update_goals_list()
+        self.refresh_goal(new_goal["id"])
         self.clear_entries()
     
+    def save_goals(self):
+        """Queue the goal changes for writing on the persistence thread"""
+        self.controller.writer.submit(self.store.path, self.store.flush)
+    
     def update_goals_list(self):
-        for item in self.goals_tree.get_children():
-            self.goals_tree.delete(item)
+        """Reconcile every row of goals_tree with the store"""
+        # Rows are keyed by goal id, so unchanged rows, the selection and the scroll position survive
+        wanted = {str(goal_id) for goal_id in self.store.goals}
+        stale = [iid for iid in self.goals_tree.get_children() if iid not in wanted]
+        if stale:
+            self.goals_tree.delete(*stale)
             
-        for goal in self.goals:
-            self.goals_tree.insert("", tk.END, values=(
-                goal["id"],
-                goal["goal"],
-                goal["date"],
-                goal["progress"],
-                goal["status"]
-            ))
+        for goal in self.store.all():
+            self.refresh_row(goal["id"])
+        self.update_analytics()
+    
+    def refresh_goal(self, goal_id):
+        """Bring one goal's row and the analytics up to date after it changed"""
+        self.refresh_row(goal_id)
+        self.update_analytics()
+    
+    def refresh_row(self, goal_id):
+        """Insert, update or delete the single row of one goal"""
+        iid = str(goal_id)
+        goal = self.store.get(goal_id)
+        if goal is None:
+            if self.goals_tree.exists(iid):
+                self.goals_tree.delete(iid)
+        elif self.goals_tree.exists(iid):
+            self.goals_tree.item(iid, values=self.goal_values(goal))
+        else:
+            # Ids only grow, so a new goal always belongs at the end
+            self.goals_tree.insert("", tk.END, iid=iid, values=self.goal_values(goal))
+    
+    def check_deadlines(self):
+        """Once the day changes, refresh only the rows whose Due text moves with it"""
+        today = datetime.now().date().toordinal()
+        if today != self.today:
+            # Goals due from the old today up to a week past the new one are the only ones
+            # that can become overdue, due today or due soon
+            last_check, self.today = self.today, today
+            for goal_id in self.store.deadlines.due_between(last_check, today + self.DUE_SOON_DAYS):
+                self.refresh_row(goal_id)
+            self.update_analytics()
+        self.after(self.DEADLINE_CHECK_MS, self.check_deadlines)
+    
+    def due_text(self, goal):
+        """Due column text for a goal"""
+        day = DeadlineIndex.deadline(goal)
+        if day is None:
+            return ""
+        elif day < self.today:
+            return "Overdue"
+        elif day == self.today:
+            return "Due today"
+        elif day < self.today + self.DUE_SOON_DAYS:
+            return "Due this week"
+        return ""
+    
+    def update_analytics(self):
+        """Show the overall figures and the selected goal's projection"""
+        analytics = self.store.analytics
+        velocity = analytics.average_velocity()
+        summary = f"Completion rate: {analytics.completion_rate():.0f}% ({analytics.completed} of {analytics.total} goals)"
+        if velocity is not None:
+            summary += f"    Average velocity: {velocity:.1f}% per day"
+        self.summary_label.config(text=summary)
+        
+        deadlines = self.store.deadlines
+        due_soon = deadlines.count_between(self.today, self.today + self.DUE_SOON_DAYS)
+        text = f"Overdue: {deadlines.overdue_count(self.today)}    Due this week: {due_soon}"
+        upcoming = deadlines.next_deadlines(self.today, 3)
+        if upcoming:
+            text += "    Next: " + ", ".join(
+                f"{self.store.get(goal_id)['goal']} ({datetime.fromordinal(day).date().isoformat()})"
+                for day, goal_id in upcoming
+            )
+        self.deadlines_label.config(text=text)
+        
+        selected = self.goals_tree.selection()
+        goal = self.store.get(int(selected[0])) if selected else None
+        if goal is None:
+            self.selected_label.config(text="Select a goal to see its projection")
+            return
+        
+        text = f"{goal['goal']}: {goal['progress']:g}%"
+        velocity = analytics.velocities.get(goal["id"])
+        if velocity is not None:
+            text += f", {velocity:.1f}% per day"
+        
+        projected = analytics.projected_completion(goal)
+        target = parse_target_date(goal["date"])
+        if goal["progress"] >= 100:
+            text += ", completed"
+        elif projected is None:
+            text += ", not enough updates to project completion"
+        else:
+            text += f", projected to finish {projected.isoformat()}"
+            if target is not None:
+                text += " (on track)" if projected <= target else f" ({(projected - target).days} days after the target)"
+        self.selected_label.config(text=text)
+    
+    def goal_values(self, goal):
+        """Treeview values for one goal row"""
+        return (
+            goal["id"],
+            goal["goal"],
+            goal["date"],
+            f"{goal['progress']:g}%",
+            goal_status(goal["progress"]),
+            self.due_text(goal)
+        )
     
     def clear_entries(self):
         self.goal_entry.delete(0, tk.END)
@@ -557,10 +1567,7 @@ class GoalTrackerApp(ttk.Frame):
             messagebox.showwarning("Warning", "Please select a goal to edit")
             return
             
-        item = self.goals_tree.item(selected[0])
-        goal_id = item["values"][0]
-        
-        goal_to_edit = next((g for g in self.goals if g["id"] == goal_id), None)
+        goal_to_edit = self.store.get(int(selected[0]))
         if not goal_to_edit:
             return
             
@@ -581,9 +1588,17 @@ class GoalTrackerApp(ttk.Frame):
         date_entry.insert(0, goal["date"])
         
         def save_changes():
-            goal["goal"] = goal_entry.get()
-            goal["date"] = date_entry.get()
-            self.update_goals_list()
+            new_date = date_entry.get().strip()
+            if new_date:
+                target = parse_target_date(new_date)
+                if target is None:
+                    messagebox.showerror("Error", "Target date must be in YYYY-MM-DD format", parent=edit_win)
+                    return
+                new_date = target.isoformat()
+            
+            self.store.update(goal["id"], goal=goal_entry.get(), date=new_date)
+            self.save_goals()
+            self.refresh_goal(goal["id"])
             edit_win.destroy()
             
         save_btn = ttk.Button(edit_win, text="Save", command=save_changes)
@@ -596,11 +1611,11 @@ class GoalTrackerApp(ttk.Frame):
             return
             
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this goal?"):
-            item = self.goals_tree.item(selected[0])
-            goal_id = item["values"][0]
-            
-            self.goals = [g for g in self.goals if g["id"] != goal_id]
-            self.update_goals_list()
+            goal_id = int(selected[0])
+            if self.store.get(goal_id):
+                self.store.delete(goal_id)
+                self.save_goals()
+            self.refresh_goal(goal_id)
     
     def mark_complete(self):
         selected = self.goals_tree.selection()
@@ -608,14 +1623,11 @@ class GoalTrackerApp(ttk.Frame):
             messagebox.showwarning("Warning", "Please select a goal")
             return
             
-        item = self.goals_tree.item(selected[0])
-        goal_id = item["values"][0]
-        
-        goal = next((g for g in self.goals if g["id"] == goal_id), None)
-        if goal:
-            goal["status"] = "Completed"
-            goal["progress"] = "100%"
-            self.update_goals_list()
+        goal_id = int(selected[0])
+        if self.store.get(goal_id):
+            self.store.set_progress(goal_id, 100.0)
+            self.save_goals()
+            self.refresh_goal(goal_id)
     
     def update_progress(self):
         selected = self.goals_tree.selection()
@@ -623,11 +1635,10 @@ class GoalTrackerApp(ttk.Frame):
             messagebox.showwarning("Warning", "Please select a goal")
             return
             
-        item = self.goals_tree.item(selected[0])
-        goal_id = item["values"][0]
-        current_progress = item["values"][3]
-        
-        self.open_progress_dialog(goal_id, current_progress)
+        goal_id = int(selected[0])
+        goal = self.store.get(goal_id)
+        if goal:
+            self.open_progress_dialog(goal_id, goal["progress"])
     
     def open_progress_dialog(self, goal_id, current_progress):
         progress_win = tk.Toplevel(self)
@@ -636,26 +1647,18 @@ class GoalTrackerApp(ttk.Frame):
         ttk.Label(progress_win, text="Progress (%):").grid(row=0, column=0, padx=5, pady=5)
         progress_entry = ttk.Entry(progress_win, width=10)
         progress_entry.grid(row=0, column=1, padx=5, pady=5)
-        progress_entry.insert(0, current_progress.replace("%", ""))
+        progress_entry.insert(0, f"{current_progress:g}")
         
         def save_progress():
             try:
-                progress = int(progress_entry.get())
+                progress = float(progress_entry.get())
                 if progress < 0 or progress > 100:
                     raise ValueError
                     
-                goal = next((g for g in self.goals if g["id"] == goal_id), None)
-                if goal:
-                    goal["progress"] = f"{progress}%"
-                    
-                    if progress == 0:
-                        goal["status"] = "Not Started"
-                    elif progress == 100:
-                        goal["status"] = "Completed"
-                    else:
-                        goal["status"] = "In Progress"
-                        
-                    self.update_goals_list()
+                if self.store.get(goal_id):
+                    self.store.set_progress(goal_id, progress)
+                    self.save_goals()
+                    self.refresh_goal(goal_id)
                     progress_win.destroy()
                     
             except ValueError:
@@ -0,0 +1,84 @@
+"""Measure how long each app takes to paint its first window
+
+Every run happens in a fresh interpreter so imports are timed too:
+    
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 10 "physical activity.py"
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# App file -> class that builds its window
+APPS = {
+    "physical activity.py": "FitnessTracker",
+    "self improvement.py": "MultiAppLauncher",
+    "study.py": "MultiAppLauncher"
+}
+
+def time_to_first_paint(filename):
+    """Seconds from importing an app until its window has been mapped and drawn"""
+    start = time.perf_counter()
+    import tkinter as tk
+    
+    sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location("app", os.path.join(APP_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    
+    root = tk.Tk()
+    getattr(module, APPS[filename])(root)
+    
+    # update() runs the Map and Expose handlers, so everything visible has been drawn
+    root.update()
+    elapsed = time.perf_counter() - start
+    root.destroy()
+    return elapsed
+
+def measure(filename, runs):
+    """Time to first paint of every run, each in its own interpreter"""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", filename],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        times.append(float(result.stdout))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first paint of the apps")
+    parser.add_argument("apps", nargs="*", help=f"apps to time, from {', '.join(APPS)} (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="runs per app (default: 5)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(time_to_first_paint(args.child))
+        return
+    
+    unknown = [filename for filename in args.apps if filename not in APPS]
+    if unknown:
+        parser.error(f"unknown app: {', '.join(unknown)}")
+    
+    for filename in args.apps or APPS:
+        try:
+            times = measure(filename, args.runs)
+        except RuntimeError as e:
+            print(f"{filename}: failed: {e}")
+            continue
+        print(
+            f"{filename}: median {statistics.median(times) * 1000:.0f} ms, "
+            f"best {min(times) * 1000:.0f} ms over {len(times)} runs"
+        )
+
+if __name__ == "__main__":
+    main()
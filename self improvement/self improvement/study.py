@@ -11,17 +11,17 @@ class MultiAppLauncher:
         self.container = ttk.Frame(root)
         self.container.pack(fill="both", expand=True)
         
-        # Initialize frames
+        # Frames are built the first time they are shown
         self.frames = {}
-        for F in (MainMenu, CalculatorApp, TranslatorApp):
-            frame = F(self.container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
         
         self.show_frame(MainMenu)
     
     def show_frame(self, cont):
-        frame = self.frames[cont]
+        frame = self.frames.get(cont)
+        if frame is None:
+            frame = cont(self.container, self)
+            self.frames[cont] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
         frame.tkraise()
         frame.event_generate("<<ShowFrame>>")
 
@@ -41,7 +41,7 @@ class MainMenu(ttk.Frame):
                          command=lambda: controller.show_frame(TranslatorApp))
         btn2.pack(fill="x", padx=100, pady=10)
         
-        quit_btn = ttk.Button(self, text="Exit", command=root.destroy)
+        quit_btn = ttk.Button(self, text="Exit", command=controller.root.destroy)
         quit_btn.pack(fill="x", padx=100, pady=30)
 
 class CalculatorApp(ttk.Frame):